@@ -0,0 +1,320 @@
+import io
+import os
+import signal
+import threading
+import time
+import zipfile
+from collections import Counter
+from contextlib import contextmanager
+from xml.etree import ElementTree
+
+import PyPDF2
+
+SPACY_MODEL = "en_core_web_sm"
+
+# detect_skills only reads token text plus the is_stop / is_alpha flags. Those
+# come from the tokenizer and the vocab's lexical attributes, so none of the
+# trained components below change its output.
+UNUSED_COMPONENTS = (
+    "tok2vec", "tagger", "morphologizer", "parser", "senter",
+    "attribute_ruler", "lemmatizer", "ner",
+)
+
+NLP_MODES = ("full", "fast", "blank")
+
+
+def load_nlp(mode="fast", model=SPACY_MODEL):
+    """Load the spaCy pipeline used for token frequencies.
+
+    ``full`` loads every component, ``fast`` skips the unused ones at load
+    time and ``blank`` uses the plain English tokenizer without the model.
+    """
+    # imported here: spaCy alone takes about a second, which processes that
+    # never run NLP (CLI commands, routes like /login) should not pay
+    import spacy
+
+    if mode == "full":
+        return spacy.load(model)
+    if mode == "fast":
+        return spacy.load(model, exclude=list(UNUSED_COMPONENTS))
+    if mode == "blank":
+        return spacy.blank("en")
+    raise ValueError(f"Unknown NLP mode {mode!r}; expected one of {NLP_MODES}")
+
+
+_shared_nlp = {}
+_shared_nlp_lock = threading.Lock()
+
+
+def shared_nlp(mode="fast"):
+    """The pipeline for ``mode``, loaded on first use and reused by the whole process."""
+    nlp = _shared_nlp.get(mode)
+    if nlp is None:
+        with _shared_nlp_lock:
+            nlp = _shared_nlp.get(mode)
+            if nlp is None:
+                nlp = _shared_nlp[mode] = load_nlp(mode)
+    return nlp
+
+
+# ---------------------- TEXT EXTRACTION ---------------------- #
+class ExtractionFailed(Exception):
+    """No text came back at all, as opposed to a document without text."""
+
+
+class ExtractionTimeout(ExtractionFailed):
+    pass
+
+
+@contextmanager
+def time_limit(seconds):
+    """Raise ExtractionTimeout in the block after ``seconds``.
+
+    Uses SIGALRM so a single pathological page can be interrupted; that is
+    only possible on the main thread (pool workers), elsewhere callers fall
+    back to checking the deadline between pages.
+    """
+    if not seconds or not hasattr(signal, "setitimer") \
+            or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def on_alarm(signum, frame):
+        raise ExtractionTimeout()
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def iter_pdf_pages(source, max_pages=None):
+    """Yield the text of each page; pages are parsed only as they are reached.
+
+    ``source`` is a path or a binary file object.
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            yield from iter_pdf_pages(f, max_pages)
+        return
+    reader = PyPDF2.PdfReader(source)
+    for number, page in enumerate(reader.pages):
+        if max_pages is not None and number >= max_pages:
+            break
+        yield page.extract_text() or ""
+
+
+def extract_text_from_pdf(path, max_chars=None, max_pages=None, time_limit_seconds=None):
+    """Page text joined with newlines, stopping at whichever budget runs out first.
+
+    Whatever was read before a timeout or a parse error is kept.
+    """
+    parts, total = [], 0
+    deadline = time.monotonic() + time_limit_seconds if time_limit_seconds else None
+    try:
+        with time_limit(time_limit_seconds):
+            for page_text in iter_pdf_pages(path, max_pages):
+                parts.append(page_text)
+                total += len(page_text) + 1
+                if max_chars is not None and total >= max_chars:
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+    except Exception:
+        pass
+    text = "\n".join(parts)
+    return text[:max_chars] if max_chars is not None else text
+
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+DOCX_RUN_TEXT = {W + "tab": "\t", W + "br": "\n", W + "cr": "\n", W + "noBreakHyphen": "-"}
+
+
+def docx_parts(names):
+    """Headers, the body, then footers: the order they read on a page."""
+    def numbered(prefix):
+        return sorted((n for n in names if n.startswith(prefix) and n.endswith(".xml")), key=lambda n: (len(n), n))
+
+    return numbered("word/header") + ["word/document.xml"] + numbered("word/footer")
+
+
+def iter_docx_part(stream):
+    """Yield the text of each paragraph of one DOCX XML part, in document order.
+
+    Table cells and text boxes are read like any other paragraph (a text box
+    comes out just before the paragraph it is anchored in). Each element is
+    dropped from the tree once it has been read, so memory stays flat however
+    long the part is.
+    """
+    open_elements, paragraphs, fallback = [], [], 0
+    for event, elem in ElementTree.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            open_elements.append(elem)
+            if tag == W + "p":
+                paragraphs.append([])
+            elif tag == MC_FALLBACK:
+                fallback += 1  # the same content again, for readers without DrawingML
+            continue
+        open_elements.pop()
+        if tag == W + "p":
+            text = "".join(paragraphs.pop())
+            if not fallback:
+                yield text
+        elif tag == MC_FALLBACK:
+            fallback -= 1
+        elif paragraphs and not fallback:
+            if tag == W + "t":
+                paragraphs[-1].append(elem.text or "")
+            elif tag in DOCX_RUN_TEXT and not elem.attrib:  # tab stops in w:pPr carry attributes
+                paragraphs[-1].append(DOCX_RUN_TEXT[tag])
+        if open_elements:
+            del open_elements[-1][-1]
+
+
+def iter_docx_paragraphs(source):
+    """Yield paragraph text from the headers, body and footers, decompressed as it is read.
+
+    ``source`` is a path or a binary file object.
+    """
+    with zipfile.ZipFile(source) as archive:
+        names = set(archive.namelist())
+        for name in docx_parts(names):
+            if name in names:
+                with archive.open(name) as stream:
+                    yield from iter_docx_part(stream)
+
+
+def extract_text_from_docx(path, max_chars=None, time_limit_seconds=None):
+    """Paragraph text joined with newlines, stopping at whichever budget runs out first.
+
+    Whatever was read before a timeout or a parse error is kept.
+    """
+    parts, total = [], 0
+    deadline = time.monotonic() + time_limit_seconds if time_limit_seconds else None
+    try:
+        with time_limit(time_limit_seconds):
+            for text in iter_docx_paragraphs(path):
+                parts.append(text)
+                total += len(text) + 1
+                if max_chars is not None and total >= max_chars:
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+    except Exception:
+        pass
+    text = "\n".join(parts)
+    return text[:max_chars] if max_chars is not None else text
+
+
+def extract_text(path, max_chars=None, max_pages=None, time_limit_seconds=None, data=None):
+    """Text of the PDF or DOCX at ``path``.
+
+    When the content is already in memory pass it as ``data``; ``path`` then
+    only supplies the file type and the file is not read from disk.
+    """
+    if data is None and not os.path.exists(path):
+        return ""
+    source = io.BytesIO(data) if data is not None else path
+    ext = path.rsplit(".", 1)[1].lower()
+    if ext == "pdf":
+        return extract_text_from_pdf(source, max_chars, max_pages, time_limit_seconds)
+    return extract_text_from_docx(source, max_chars, time_limit_seconds)
+
+
+# ---------------------- SKILL DETECTION ---------------------- #
+def rank_skills(hits, doc):
+    # hits come back keyed by term; ordering by first position keeps ties stable
+    found = sorted(hits.items(), key=lambda kv: kv[1][0])
+    tokens = [t.text.lower() for t in doc if not t.is_stop and t.is_alpha]
+    freq = Counter(tokens)
+    # return top matches sorted by token frequency (so relevant terms bubble up)
+    return sorted([s for s, _ in found], key=lambda s: -freq.get(s, 0))
+
+
+def detect_skills(text, matcher, nlp):
+    return rank_skills(matcher.find(text), nlp(text or ""))
+
+
+def detect_skills_batch(texts, matcher, nlp, batch_size=16, n_process=1):
+    """detect_skills over many texts, tokenised in batches via ``nlp.pipe``."""
+    texts = [t or "" for t in texts]
+    docs = nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+    return [rank_skills(matcher.find(text), doc) for text, doc in zip(texts, docs)]
+
+
+def score_skills(detected, required):
+    """Percentage of ``required`` skills present in ``detected``."""
+    matched = set(detected).intersection(required)
+    return round(len(matched) / len(required) * 100, 1) if required else 0
+
+
+# ---------------------- PROCESS POOL WORKERS ---------------------- #
+# Each pool process builds its own matcher and spaCy pipeline once, in
+# init_worker, and reuses them for every file it is handed.
+_worker = {}
+
+
+def _worker_matcher(taxonomy):
+    # taxonomy is SkillMatcher.spec(); rebuild only when the app has reloaded it
+    from skills import SkillMatcher
+
+    version, vocab, aliases = taxonomy
+    if _worker.get("taxonomy") != version:
+        _worker["matcher"] = SkillMatcher(vocab, aliases)
+        _worker["taxonomy"] = version
+    return _worker["matcher"]
+
+
+def init_worker(taxonomy, nlp_mode):
+    _worker_matcher(taxonomy)
+    _worker["nlp"] = load_nlp(nlp_mode)
+
+
+def analyze_files(paths, required, matcher=None, nlp=None, text_limit=10000, batch_size=16,
+                  extract_limits=None, taxonomy=None, extract=extract_text):
+    """Extract, detect and score a chunk of files.
+
+    Runs inside a pool process (using the objects from init_worker, or a
+    matcher rebuilt from ``taxonomy`` when that is newer) or inline when
+    ``matcher`` and ``nlp`` are passed, with ``extract`` standing in for
+    extract_text (the app hands it to its extraction processes). Returns one dict per
+    path, in order; a file that fails carries an ``error`` instead of
+    failing the whole chunk. ``timings`` holds seconds per stage so the app
+    process can record them; detection runs batched, so its time is split
+    evenly across the chunk.
+    """
+    if matcher is None:
+        matcher = _worker_matcher(taxonomy) if taxonomy else _worker["matcher"]
+    nlp = nlp or _worker["nlp"]
+    texts, errors, extract_seconds = [], [], []
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            texts.append(extract(path, **(extract_limits or {})))
+            errors.append(None)
+        except Exception as exc:
+            texts.append("")
+            errors.append(f"{type(exc).__name__}: {exc}")
+        extract_seconds.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    detected_all = detect_skills_batch(texts, matcher, nlp, batch_size=batch_size)
+    detect_seconds = (time.perf_counter() - start) / max(len(paths), 1)
+
+    results = []
+    for path, text, detected, error, extracted in zip(paths, texts, detected_all, errors, extract_seconds):
+        start = time.perf_counter()
+        score = score_skills(detected, required)
+        results.append({
+            "path": path,
+            "text": text[:text_limit],
+            "detected": detected,
+            "score": score,
+            "error": error,
+            "timings": {"extract": extracted, "detect": detect_seconds, "score": time.perf_counter() - start},
+        })
+    return results
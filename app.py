@@ -1,23 +1,54 @@
 import os
-from collections import Counter
-from datetime import datetime
+import atexit
+import cProfile
+import gc
+import hashlib
+import hmac
+import json
+import random
+import tempfile
+import threading
+import time
+import uuid
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
 from flask import (
     Flask, render_template, redirect, url_for, flash,
-    request, abort, send_from_directory
+    request, abort, send_from_directory, send_file, jsonify, g, session, make_response,
+    Response, stream_with_context
 )
 from flask_login import LoginManager, login_user, login_required, logout_user, current_user
-from werkzeug.utils import secure_filename
-import spacy
-from docx import Document
-import PyPDF2
+from sqlalchemy.exc import IntegrityError
 
 from config import Config
-from models import db, User, Resume, JobPost, JobApplication
+from skills import SkillTaxonomy
+from analysis import (
+    shared_nlp, extract_text, detect_skills as run_detect_skills,
+    score_skills, init_worker, analyze_files, ExtractionFailed, ExtractionTimeout
+)
+from cache import LRUCache
+from storage import store_upload, UploadRejected
+from models import (
+    db, User, Resume, JobPost, JobApplication, ResumeFile, AnalysisBatch, AnalysisTask,
+    Skill, ApplicationSkill, DocumentText, skill_links, store_texts, text_columns, touch_jobs,
+    ensure_schema, apply_sqlite_pragmas, APPLICATION_RERANK, is_temp_job, SHORTLIST_SCORE
+)
+from tasks import start_workers, wake_workers
+from reclaim import start_reclaimer, wake_reclaimer, mark_jobs_deleted
+from listings import application_page
+from search import search_page, SCOPES as SEARCH_SCOPES
+from export import export_chunks, csv_stream, write_parquet, ExportUnavailable, FORMATS as EXPORT_FORMATS
+from persistence import insert_analysed
+from scoring import term_vector, pack, unpack, stack, cosine_scores
+from skill_index import SkillIndex
+import metrics
+from metrics import STAGE_SECONDS, FILES_TOTAL, CACHE_TOTAL, REQUEST_SECONDS
 from forms import RegisterForm, LoginForm, UploadForm, JobForm
 
 ALLOWED_EXT = {"pdf", "docx"}
 MAX_FILES_PER_REQUEST = 100
-nlp = spacy.load("en_core_web_sm")
 
 
 def create_app():
@@ -34,129 +65,680 @@ def create_app():
     def load_user(user_id):
         return User.query.get(int(user_id))
 
-    # ---------------------- SKILLS VOCAB (expanded) ---------------------- #
-    SKILLS_VOCAB = [
-        # Core programming & scripting
-        "python","java","javascript","typescript","c++","c#","go","rust","ruby","php","swift","kotlin",
-        "scala","perl","bash","powershell","r","matlab","objective-c","dart","assembly",
-        # Web & frontend
-        "html","css","sass","less","bootstrap","tailwind","react","react native","vue","angular","svelte",
-        "next.js","nuxt","ember","jquery","webpack","rollup","vite","parcel",
-        # Backend & frameworks
-        "node.js","express","django","flask","fastapi","spring boot","laravel","symfony","asp.net","rails",
-        # APIs & protocols
-        "rest","graphql","grpc","websocket","oauth","jwt","openapi","swagger",
-        # Databases
-        "mysql","postgresql","sqlite","mongodb","redis","cassandra","dynamodb","cockroachdb","oracle","mssql",
-        "elasticsearch","influxdb","timescaledb",
-        # Cloud & infra
-        "aws","azure","gcp","cloudflare","digitalocean","heroku","ibm cloud","oracle cloud",
-        "ec2","s3","lambda","iam","vpc","rds","eks","gke","aks",
-        # DevOps & CI/CD
-        "docker","kubernetes","k8s","helm","terraform","ansible","chef","puppet","circleci","travis","github actions",
-        "gitlab ci","jenkins","ci/cd","prometheus","grafana","monitoring","logstash","filebeat",
-        # ML/AI/Data
-        "machine learning","deep learning","data science","nlp","computer vision","pytorch","tensorflow","keras",
-        "scikit-learn","xgboost","lightgbm","nlp","transformers","huggingface","openai","llm","chatgpt","gpt-4",
-        "pandas","numpy","matplotlib","seaborn","plotly","data engineering","spark","hadoop","airflow","dbt",
-        # MLOps & GenAI
-        "mlops","sagemaker","bentoml","onnx","tensorRT","model serving","feature store","mlflow",
-        # Testing & QA
-        "pytest","junit","mocha","jest","selenium","cypress","robot framework","webdriverio","karma",
-        # Security
-        "cybersecurity","penetration testing","ethical hacking","owasp","sso","ssl","tls","firewall","siem","ids","ips",
-        # Networking & OS
-        "linux","ubuntu","centos","debian","windows server","tcp/ip","dns","dhcp","vpn","routing","iptables",
-        # Mobile
-        "android","ios","flutter","react native","swiftui","kotlin multiplatform",
-        # Data / BI / Analytics
-        "tableau","power bi","looker","metabase","bigquery","redshift","snowflake","data lake","etl","bi",
-        # Low-code/No-code / Automation
-        "rpa","uiPath","automation anywhere","makr","zapier","integromat",
-        # Blockchain / Web3
-        "blockchain","solidity","web3","ethereum","smart contracts","nft","dapp","metamask",
-        # IoT & Embedded
-        "arduino","raspberry pi","embedded c","iot","mqtt","zigbee","lorawan",
-        # Project & product
-        "agile","scrum","kanban","jira","confluence","product management","roadmap","stakeholder",
-        # Design & UX
-        "figma","adobe xd","photoshop","illustrator","ux research","ui design","wireframing","prototyping",
-        # Marketing & growth
-        "seo","sem","ppc","google analytics","content marketing","email marketing","social media",
-        # HR & hiring
-        "recruiting","talent acquisition","sourcing","onboarding","hris","performance management",
-        # Soft skills (common keywords)
-        "leadership","communication","teamwork","mentoring","coaching","time management","problem solving",
-        # Add many more job-specific keywords and synonyms to broaden coverage
-        # (Below is an extended list of commonly used technical and domain keywords)
-        "microservices","monolith","serverless","edge computing","observability","scalability","high availability",
-        "load balancing","caching","cdn","reverse proxy","nginx","apache","istio","linkerd","service mesh",
-        "oauth2","saml","sso","account provisioning","ldap","active directory",
-        "mobile testing","accessibility","a11y","internationalization","localization",
-        "functional programming","object oriented","design patterns","clean architecture",
-        "ci","cd","test automation","infrastructure as code","immutable infrastructure",
-        "object storage","block storage","backup","disaster recovery","replication",
-        "data modeling","schema design","normalization","denormalization",
-        "etl pipeline","streaming","kafka","rabbitmq","pub/sub","kinesis","flink",
-        "quantitative research","statistical modeling","time series","forecasting",
-        "recommendation systems","nlp pipeline","named entity recognition","sentiment analysis",
-        "reinforcement learning","computer graphics","opencv","image processing",
-        "gpu programming","cuda","parallel computing","multithreading","concurrency",
-        "performance tuning","profiling","benchmarking","latency","throughput",
-        "billing","fintech","payments","stripe","paypal","klarna","banking",
-        "healthcare it","ehr","hl7","fhir","medical imaging",
-        "automation testing","test-driven development","bdd","tdd","acceptance criteria",
-        "cms","drupal","wordpress","magento","shopify",
-        "ecommerce","payment gateway","inventory management",
-        "voice assistant","speech recognition","asr","tts",
-        "graph databases","neo4j","query optimization","cypher",
-        "vector databases","pinecone","weaviate","faiss","embeddings",
-        "search","solr","lucene","full-text search","ranking","relevance",
-        "business analysis","requirements gathering","use cases","user stories",
-        "contract negotiation","vendor management","supply chain",
-        "manufacturing","automation","scada","plc",
-        "3d printing","cad","solidworks","autocad",
-        # (You can expand further by adding company-specific or niche keywords)
-    ]
+    # skills and aliases come from a data file that is re-read when it changes;
+    # always go through skill_matcher() so the current version is used
+    taxonomy = SkillTaxonomy(app.config["SKILLS_TAXONOMY_PATH"], app.config["SKILLS_TAXONOMY_CHECK_SECONDS"])
+    app.extensions["skill_taxonomy"] = taxonomy
+    skill_matcher = taxonomy.matcher
+
+    # skill -> resume ids over every stored resume, for job match search;
+    # built on first use and extended with new resumes after each write
+    resume_index = SkillIndex()
+    app.extensions["skill_index"] = resume_index
 
     # ---------------------- UTILITIES ---------------------- #
     def allowed_file(filename):
         return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXT
 
-    def extract_text_from_pdf(path):
-        text = ""
-        try:
-            with open(path, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                for page in reader.pages:
-                    text += page.extract_text() or ""
-        except Exception:
-            pass
-        return text
+    def live_jobs():
+        # deleted jobs stay until the reclaimer has removed their rows
+        return JobPost.query.filter(JobPost.deleted_at.is_(None))
+
+    def own_job_or_404(job_id):
+        return live_jobs().filter_by(job_id=job_id, hr_id=current_user.id).first_or_404()
+
+    def get_nlp():
+        return shared_nlp(app.config["NLP_MODE"])
+
+    def detect_skills(text):
+        return run_detect_skills(text, skill_matcher(), get_nlp())
+
+    def file_type(filename):
+        return filename.rsplit(".", 1)[-1].lower()
+
+    # ---------------------- EXTRACTION CACHE ---------------------- #
+    # Uploads are stored by content hash; the analysis of each unique file is
+    # cached in memory and on its ResumeFile row so repeats skip extraction and NLP.
+    extraction_cache = LRUCache(app.config["EXTRACTION_CACHE_SIZE"])
+
+    extract_limits = {
+        "max_chars": app.config["EXTRACT_MAX_CHARS"],
+        "max_pages": app.config["EXTRACT_MAX_PAGES"],
+        "time_limit_seconds": app.config["EXTRACT_TIME_LIMIT_SECONDS"],
+    }
+
+    def upload_path(filename):
+        return os.path.join(app.config["UPLOAD_FOLDER"], filename)
+
+    def save_upload(file, keep_in_memory=False):
+        return store_upload(
+            file, app.config["UPLOAD_FOLDER"],
+            max_bytes=app.config["MAX_UPLOAD_FILE_BYTES"],
+            keep_bytes=app.config["UPLOAD_MEMORY_BYTES"] if keep_in_memory else 0,
+        )
+
+    def cached_analysis(sha256):
+        version = skill_matcher().version
+        hit = extraction_cache.get((version, sha256))
+        if hit is not None:
+            CACHE_TOTAL.inc(cache="extraction", result="memory")
+            return hit
+        row = ResumeFile.query.filter_by(sha256=sha256).first()
+        if row is None or row.text_id is None:
+            CACHE_TOTAL.inc(cache="extraction", result="miss")
+            return None
+        CACHE_TOTAL.inc(cache="extraction", result="database")
+        row.last_used_at = datetime.utcnow()
+        text = row.text
+        if row.taxonomy_version == version:
+            detected = row.detected_skills.split(",") if row.detected_skills else []
+        else:
+            # analysed under another taxonomy: keep the text, detect skills again
+            detected = detect_skills(text)
+            row.detected_skills = ",".join(detected)
+            row.taxonomy_version = version
+        hit = (text, detected)
+        extraction_cache.put((version, sha256), hit)
+        return hit
+
+    def remember_analysis(sha256, filename, text, detected):
+        text = text[:10000]
+        version = skill_matcher().version
+        extraction_cache.put((version, sha256), (text, detected))
+        row = ResumeFile.query.filter_by(sha256=sha256).first()
+        if row is None:
+            row = ResumeFile(sha256=sha256, filename=filename, size=os.path.getsize(upload_path(filename)))
+            try:
+                with db.session.begin_nested():
+                    db.session.add(row)
+            except IntegrityError:  # another worker stored the same file first
+                row = ResumeFile.query.filter_by(sha256=sha256).one()
+            evict_extraction_cache()
+        row.text_id = store_texts([text])[0]
+        row.detected_skills = ",".join(detected)
+        row.taxonomy_version = version
+        row.last_used_at = datetime.utcnow()
+        return text, detected
 
-    def extract_text_from_docx(path):
+    def evict_extraction_cache():
+        cached = ResumeFile.query.filter(ResumeFile.text_id.isnot(None))
+        excess = cached.count() - app.config["EXTRACTION_CACHE_MAX_ROWS"]
+        if excess <= 0:
+            return
+        oldest = cached.order_by(ResumeFile.last_used_at).limit(excess).with_entities(ResumeFile.id)
+        ResumeFile.query.filter(ResumeFile.id.in_(oldest.scalar_subquery())).update(
+            {"text_id": None, "detected_skills": None}, synchronize_session=False
+        )
+
+    def analyze_upload(sha256, filename, data=None, source="upload"):
+        """(text, detected skills) for a stored upload, from cache when possible.
+
+        ``data`` is the file content when the upload was small enough to keep in memory.
+        """
+        hit = cached_analysis(sha256)
+        if hit is not None:
+            FILES_TOTAL.inc(source=source, outcome="done")
+            return hit
+        kind = file_type(filename)
         try:
-            doc = Document(path)
-            return "\n".join([p.text for p in doc.paragraphs])
+            with STAGE_SECONDS.time(stage="extract", file_type=kind):
+                text = extract_isolated(upload_path(filename), data=data, **extract_limits)
+            with STAGE_SECONDS.time(stage="detect", file_type=kind):
+                detected = detect_skills(text)
         except Exception:
-            return ""
+            FILES_TOTAL.inc(source=source, outcome="failed")
+            raise
+        FILES_TOTAL.inc(source=source, outcome="done")
+        return remember_analysis(sha256, filename, text, detected)
 
-    def extract_text(path):
-        if not os.path.exists(path):
-            return ""
-        ext = path.rsplit(".", 1)[1].lower()
-        return extract_text_from_pdf(path) if ext == "pdf" else extract_text_from_docx(path)
+    # ---------------------- ANALYSIS EXECUTOR ---------------------- #
+    # Process pool for bulk uploads, created on first use and kept for the
+    # life of the app so workers load spaCy once. A pool whose process died
+    # (out of memory, a crash in a PDF library) is broken for good: it is
+    # dropped and the next call starts a new one.
+    executor = None
+    executor_lock = threading.Lock()
 
-    def detect_skills(text):
-        lower = (text or "").lower()
-        found = {s for s in SKILLS_VOCAB if s in lower}
-        doc = nlp(text or "")
-        tokens = [t.text.lower() for t in doc if not t.is_stop and t.is_alpha]
-        freq = Counter(tokens)
-        # return top matches sorted by token frequency (so relevant terms bubble up)
-        return sorted(list(found), key=lambda s: -freq.get(s, 0))
+    def analysis_executor():
+        nonlocal executor
+        with executor_lock:
+            if executor is None:
+                executor = ProcessPoolExecutor(
+                    max_workers=app.config["ANALYSIS_WORKERS"],
+                    mp_context=multiprocessing.get_context(app.config["ANALYSIS_START_METHOD"]),
+                    initializer=init_worker,
+                    initargs=(skill_matcher().spec(), app.config["NLP_MODE"]),
+                )
+                atexit.register(executor.shutdown, wait=False, cancel_futures=True)
+            return executor
+
+    def discard_executor(broken):
+        nonlocal executor
+        with executor_lock:
+            if executor is broken:
+                executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    # ---------------------- EXTRACTION PROCESSES ---------------------- #
+    # Files extracted outside the analysis pool (single uploads, small queue
+    # groups) go to a few plain processes as well: the SIGALRM limit that can
+    # stop a pathological page only works on a process's main thread, and
+    # requests and queue workers run in threads.
+    extractor = None
+    extractor_lock = threading.Lock()
+
+    def extraction_executor():
+        nonlocal extractor
+        with extractor_lock:
+            if extractor is None:
+                extractor = ProcessPoolExecutor(
+                    max_workers=app.config["EXTRACT_PROCESSES"],
+                    mp_context=multiprocessing.get_context(app.config["ANALYSIS_START_METHOD"]),
+                )
+                atexit.register(extractor.shutdown, wait=False, cancel_futures=True)
+            return extractor
+
+    def discard_extractor(broken, kill=False):
+        nonlocal extractor
+        with extractor_lock:
+            if extractor is broken:
+                extractor = None
+        if kill:
+            # a wedged process would otherwise hold the pool, and shutdown, forever
+            for process in list((broken._processes or {}).values()):
+                process.kill()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def extract_isolated(path, data=None, time_limit_seconds=None, **limits):
+        """extract_text in an extraction process, so ``time_limit_seconds`` is a hard limit.
+
+        Raises ExtractionFailed when no text came back, so the caller does not
+        take (and cache) it for an empty document.
+        """
+        if not time_limit_seconds or app.config["EXTRACT_PROCESSES"] <= 0:
+            return extract_text(path, data=data, time_limit_seconds=time_limit_seconds, **limits)
+        name = os.path.basename(path)
+        # One process dying breaks the whole pool, so files other threads had
+        # in it fail with it: each call gets a second try on a new pool, and
+        # only a file that breaks that one too is reported.
+        for attempt in range(2):
+            pool = extraction_executor()
+            try:
+                future = pool.submit(extract_text, path, data=data, time_limit_seconds=time_limit_seconds, **limits)
+                while True:
+                    try:
+                        # the alarm stops the work in the process; waiting longer
+                        # only happens if it is stuck where a signal cannot reach
+                        return future.result(timeout=time_limit_seconds + 5)
+                    except FutureTimeout:
+                        if future.running():
+                            break
+                        # still queued behind other files: its limit has not started
+            except BrokenProcessPool as exc:
+                discard_extractor(pool)
+                if attempt:
+                    app.logger.warning("extraction of %s failed: %r", name, exc)
+                    raise ExtractionFailed(f"the process extracting {name} stopped") from exc
+                continue
+            app.logger.warning("extraction of %s did not stop after %ss", name, time_limit_seconds)
+            discard_extractor(pool, kill=True)
+            raise ExtractionTimeout(f"{name} took longer than {time_limit_seconds:g}s to read")
+
+    def analyze_batch(paths, required):
+        chunk_size = app.config["ANALYSIS_CHUNK_SIZE"]
+        batch_size = app.config["NLP_BATCH_SIZE"]
+        if app.config["ANALYSIS_WORKERS"] <= 1 or len(paths) <= chunk_size:
+            return analyze_files(paths, required, matcher=skill_matcher(), nlp=get_nlp(),
+                                 batch_size=batch_size, extract_limits=extract_limits, extract=extract_isolated)
+
+        chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+
+        def submit(pool, chunk):
+            return pool.submit(analyze_files, chunk, required, batch_size=batch_size, extract_limits=extract_limits,
+                               taxonomy=skill_matcher().spec())
+
+        def failed(chunk, exc):
+            return [{"path": path, "text": "", "detected": [], "score": 0, "error": str(exc) or repr(exc)}
+                    for path in chunk]
+
+        results, lost = [None] * len(chunks), []
+        pool = analysis_executor()
+        futures = {}
+        for number, chunk in enumerate(chunks):
+            try:
+                futures[number] = submit(pool, chunk)
+            except BrokenProcessPool:
+                lost.append(number)
+        for number, future in futures.items():
+            try:
+                results[number] = future.result()
+            except BrokenProcessPool:
+                lost.append(number)
+            except Exception as exc:
+                results[number] = failed(chunks[number], exc)
+
+        if lost:
+            # a dying process fails every chunk still in the pool; retry them one
+            # at a time on a new pool so only the chunk that kills it again fails
+            discard_executor(pool)
+            for number in sorted(lost):
+                pool = analysis_executor()
+                try:
+                    results[number] = submit(pool, chunks[number]).result()
+                except BrokenProcessPool as exc:
+                    discard_executor(pool)
+                    results[number] = failed(chunks[number], exc)
+                except Exception as exc:
+                    results[number] = failed(chunks[number], exc)
+        return [result for chunk_results in results for result in chunk_results]
+
+    # ---------------------- QUEUE HANDLER ---------------------- #
+    def handle_tasks(tasks):
+        """Run the tasks claimed by a queue worker, grouped by kind."""
+        uploads = [task for task in tasks if task.kind in (None, "analyse")]
+        if uploads:
+            process_analysis_tasks(uploads)
+        rescoring = [task for task in tasks if task.kind in ("rescore", "rerank")]
+        if rescoring:
+            process_rescore_tasks(rescoring)
+
+    def process_analysis_tasks(tasks):
+        """Analyse uploaded files and store their results."""
+        by_batch = {}
+        for task in tasks:
+            by_batch.setdefault(task.batch_id, []).append(task)
+
+        for batch_pk, group in by_batch.items():
+            batch = db.session.get(AnalysisBatch, batch_pk)
+            required = batch.required_skills.split(",") if batch.required_skills else []
+
+            # only files never analysed before go to the pool, each once
+            analyses, errors, pending = {}, {}, {}
+            for task in group:
+                hit = cached_analysis(task.sha256)
+                if hit is not None:
+                    analyses[task.sha256] = hit
+                else:
+                    pending.setdefault(task.sha256, task.filename)
+            results = analyze_batch([upload_path(f) for f in pending.values()], required)
+            for (sha256, filename), result in zip(pending.items(), results):
+                for stage, seconds in result.get("timings", {}).items():
+                    STAGE_SECONDS.observe(seconds, stage=stage, file_type=file_type(filename))
+                if result["error"]:
+                    errors[sha256] = result["error"]
+                else:
+                    analyses[sha256] = remember_analysis(sha256, filename, result["text"], result["detected"])
+
+            now = datetime.utcnow()
+            for task in group:
+                task.finished_at = now
+                if task.sha256 in errors:
+                    task.status = "failed"
+                    task.error = errors[task.sha256]
+            analysed = [task for task in group if task.sha256 not in errors]
+
+            # Resume records (uploaded by HR), one multi-row insert for the group
+            persist_started = time.perf_counter()
+            resumes = insert_analysed(Resume, [
+                {
+                    "user_id": batch.hr_id,
+                    "filename": task.filename,
+                    "original_filename": task.original_filename,
+                    "text": analyses[task.sha256][0][:10000],
+                    "created_at": now,
+                    "skills": analyses[task.sha256][1],
+                }
+                for task in analysed
+            ])
+            for task, (resume_id, error) in zip(analysed, resumes):
+                if error:
+                    task.status = "failed"
+                    task.error = error
+                task.resume_id = resume_id
+            analysed = [task for task, (_, error) in zip(analysed, resumes) if not error]
+
+            # Applications linked to the batch's job
+            application_rows = []
+            for task in analysed:
+                text, detected = analyses[task.sha256]
+                score = score_skills(detected, required)
+                application_rows.append({
+                    "job_id": batch.job_id,
+                    "candidate_id": batch.hr_id,  # HR uploaded - placeholder; you'll replace with real candidate link later
+                    "filename": task.filename,
+                    "original_filename": task.original_filename,
+                    "text": text[:10000],
+                    "term_vector": text_vector(text[:10000]),
+                    "score": score,
+                    "shortlisted": score >= SHORTLIST_SCORE,
+                    "created_at": now,
+                    "skills": detected,
+                })
+            for task, (application_id, error) in zip(analysed, insert_analysed(JobApplication, application_rows)):
+                if error:
+                    task.status = "failed"
+                    task.error = error
+                else:
+                    task.status = "done"
+                    task.application_id = application_id
+            rerank_job(db.session.get(JobPost, batch.job_id))
+            touch_jobs([batch.job_id])
+            # every row from the claimed group is written in a single transaction
+            db.session.commit()
+            STAGE_SECONDS.observe(time.perf_counter() - persist_started, stage="persist", file_type="batch")
+            for task in group:
+                FILES_TOTAL.inc(source="bulk", outcome=task.status)
+
+    def applications_with_skills(names):
+        """Subquery of JobApplication ids that have all of ``names``."""
+        names = set(names)
+        return (
+            db.select(ApplicationSkill.application_id)
+            .join(Skill, Skill.id == ApplicationSkill.skill_id)
+            .where(Skill.name.in_(names))
+            .group_by(ApplicationSkill.application_id)
+            .having(db.func.count(ApplicationSkill.skill_id) == len(names))
+        )
+
+    # ---------------------- JOB SKILL PROFILES ---------------------- #
+    # Required skills per job description, keyed by a hash of the text so a
+    # description is parsed once no matter how many resumes are scored against it.
+    job_profile_cache = LRUCache(app.config["JOB_PROFILE_CACHE_SIZE"])
+
+    def content_hash(text):
+        # the taxonomy version is part of the key, so a reloaded taxonomy
+        # re-profiles each job the next time its skills are needed
+        return hashlib.sha256((skill_matcher().version + (text or "")).encode("utf-8")).hexdigest()
+
+    def profile_description(text):
+        digest = content_hash(text)
+        skills = job_profile_cache.get(digest)
+        CACHE_TOTAL.inc(cache="job_profile", result="miss" if skills is None else "memory")
+        if skills is None:
+            skills = detect_skills(text)
+            job_profile_cache.put(digest, skills)
+        return digest, skills
+
+    def set_job_profile(job):
+        job.description_hash, skills = profile_description(job.description)
+        job.required_skills = ",".join(skills)
+        job.term_vector = text_vector(job.description)
+        return skills
+
+    def job_required_skills(job):
+        digest = content_hash(job.description)
+        if job.description_hash == digest and job.required_skills is not None:
+            skills = job_profile_cache.get(digest)
+            if skills is None:
+                skills = job.required_skills.split(",") if job.required_skills else []
+                job_profile_cache.put(digest, skills)
+            return skills
+        # job saved before profiles existed: compute now, caller commits
+        return set_job_profile(job)
+
+    # ---------------------- RE-SCORING ---------------------- #
+    # Editing a job description queues updates for the applications whose ATS
+    # score can change. Scores come from the stored skill links; no file is read.
+    def queue_rescore(job, old_skills, new_skills):
+        """Add background tasks for ``job`` to the session; returns (batch, applications queued)."""
+        if not db.session.query(JobApplication.query.filter_by(job_id=job.id).exists()).scalar():
+            return None, 0
+        old_skills, new_skills = set(old_skills), set(new_skills)
+        if len(old_skills) != len(new_skills):
+            # the denominator changed: every application matching either set moves
+            changed = old_skills | new_skills
+        else:
+            changed = old_skills ^ new_skills
+        affected = []
+        if changed:
+            affected = [
+                application_id for (application_id,) in
+                db.session.query(ApplicationSkill.application_id)
+                .join(JobApplication, JobApplication.id == ApplicationSkill.application_id)
+                .join(Skill, Skill.id == ApplicationSkill.skill_id)
+                .filter(JobApplication.job_id == job.id, Skill.name.in_(changed))
+                .distinct()
+                .order_by(ApplicationSkill.application_id)
+            ]
+
+        batch = AnalysisBatch(batch_id=uuid.uuid4().hex, hr_id=job.hr_id, job_id=job.id,
+                              required_skills=",".join(sorted(new_skills)), total=0)
+        db.session.add(batch)
+        chunk_size = app.config["RESCORE_CHUNK_SIZE"]
+        for i in range(0, len(affected), chunk_size):
+            db.session.add(AnalysisTask(batch=batch, kind="rescore", filename="",
+                                        payload=json.dumps(affected[i:i + chunk_size])))
+            batch.total += 1
+        # similarity depends on the whole description, so the job is always re-ranked
+        db.session.add(AnalysisTask(batch=batch, kind="rerank", filename=""))
+        batch.total += 1
+        return batch, len(affected)
+
+    def queue_rerank(job):
+        """Queue a similarity refresh after a new application, unless one is already waiting.
+
+        Similarity uses IDF over all of the job's applicants, so every row moves;
+        a burst of applications shares one re-rank. Caller commits; returns
+        whether a task was added.
+        """
+        waiting = (
+            db.session.query(AnalysisTask.id)
+            .join(AnalysisBatch, AnalysisBatch.id == AnalysisTask.batch_id)
+            .filter(AnalysisBatch.job_id == job.id, AnalysisTask.kind == "rerank", AnalysisTask.status == "queued")
+            .first()
+        )
+        if waiting:
+            return False
+        batch = AnalysisBatch(batch_id=uuid.uuid4().hex, hr_id=job.hr_id, job_id=job.id,
+                              required_skills=job.required_skills, total=1)
+        db.session.add(AnalysisTask(batch=batch, kind="rerank", filename="", payload=APPLICATION_RERANK))
+        return True
+
+    def process_rescore_tasks(tasks):
+        """Re-score and re-rank against each job's current required skills.
+
+        The current profile is used rather than the one at queue time, so tasks
+        left over from an earlier edit still write correct scores.
+        """
+        for task in tasks:
+            job = db.session.get(JobPost, task.batch.job_id)
+            if job is None:
+                task.status = "failed"
+                task.error = "job deleted"
+            elif task.kind == "rerank":
+                rerank_job(job)
+                task.status = "done"
+            else:
+                required = job_required_skills(job)
+                ids = [
+                    application_id for (application_id,) in
+                    db.session.query(JobApplication.id)
+                    .filter(JobApplication.id.in_(json.loads(task.payload)), JobApplication.job_id == job.id)
+                ]
+                hits = dict(
+                    db.session.query(ApplicationSkill.application_id, db.func.count())
+                    .join(Skill, Skill.id == ApplicationSkill.skill_id)
+                    .filter(ApplicationSkill.application_id.in_(ids), Skill.name.in_(required))
+                    .group_by(ApplicationSkill.application_id)
+                ) if required else {}
+                updates = []
+                for application_id in ids:
+                    score = round(hits.get(application_id, 0) / len(required) * 100, 1) if required else 0
+                    updates.append({"id": application_id, "score": score, "shortlisted": score >= SHORTLIST_SCORE})
+                if updates:
+                    db.session.execute(db.update(JobApplication), updates)
+                task.status = "done"
+            task.finished_at = datetime.utcnow()
+        touch_jobs(task.batch.job_id for task in tasks)
+        db.session.commit()
+
+    def rescore_progress(job):
+        """Number of the job's re-score tasks still queued or running, or None."""
+        counts = dict(
+            db.session.query(AnalysisTask.status, db.func.count(AnalysisTask.id))
+            .join(AnalysisBatch, AnalysisBatch.id == AnalysisTask.batch_id)
+            .filter(AnalysisBatch.job_id == job.id, AnalysisTask.kind.in_(("rescore", "rerank")),
+                    AnalysisTask.status.in_(("queued", "running")),
+                    db.func.coalesce(AnalysisTask.payload, "") != APPLICATION_RERANK)
+            .group_by(AnalysisTask.status)
+            .all()
+        )
+        return sum(counts.values()) or None
+
+    # ---------------------- SIMILARITY RANKING ---------------------- #
+    def text_vector(text):
+        return pack(term_vector(text, skill_matcher(), app.config["SKILL_FEATURE_WEIGHT"]))
+
+    def rerank_job(job):
+        """Refresh JobApplication.similarity for all applicants of ``job``; caller commits."""
+        if job.term_vector is None:
+            job.term_vector = text_vector(job.description)
+        rows = (
+            db.session.query(JobApplication.id, JobApplication.term_vector, JobApplication.text_id)
+            .filter(JobApplication.job_id == job.id)
+            .all()
+        )
+        blobs, backfill = [], []
+        for row in rows:
+            blob = row.term_vector
+            if blob is None:  # stored before vectors existed
+                document = db.session.get(DocumentText, row.text_id) if row.text_id else None
+                blob = text_vector(document.text if document else "")
+                backfill.append({"id": row.id, "term_vector": blob})
+            blobs.append(blob)
+        if backfill:
+            db.session.execute(db.update(JobApplication), backfill)
+        if rows:
+            scores = cosine_scores(stack(blobs), unpack(job.term_vector))
+            db.session.execute(db.update(JobApplication), [
+                {"id": row.id, "similarity": round(float(s), 4)} for row, s in zip(rows, scores)
+            ])
+
+    # ---------------------- HR PAGE CACHE ---------------------- #
+    # The data behind each HR page is cached under a key that includes the
+    # revision touch_jobs() bumps on every write, so a reload of an unchanged
+    # page costs no listing queries, and a browser revalidating it with the
+    # ETag gets a 304 without any lookup or render. Keys always hold the user
+    # and never a bare rowid: SQLite hands the id of a deleted job or batch to
+    # the next one, whose revision soon reaches the same value.
+    page_cache = LRUCache(app.config["PAGE_CACHE_SIZE"])
+    template_dir = os.path.join(app.root_path, app.template_folder)
+    templates_stamp = max((e.stat().st_mtime for e in os.scandir(template_dir)), default=0)
+
+    def page_etag(key):
+        # the forms on a page carry the session's CSRF token, which expires:
+        # a render is revalidated for at most half the token lifetime
+        limit = app.config.get("WTF_CSRF_TIME_LIMIT", 3600)
+        window = int(time.time() // (limit / 2)) if limit else 0
+        raw = repr((key, current_user.get_id(), session.get("csrf_token"), window, templates_stamp))
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def last_modified(changed_at):
+        # rounded up to a whole second, and left out while that second is still
+        # current, so a later change can never carry the same Last-Modified
+        if changed_at is None:
+            return None
+        stamp = changed_at.replace(microsecond=0) + timedelta(seconds=1)
+        return stamp if stamp <= datetime.utcnow() else None
+
+    def cached_page(key, changed_at, build, render):
+        """Response for an HR page whose data ``build()`` returns, cached under ``key``."""
+        # a page showing flashed messages is a one-off: not cached by the browser
+        conditional = request.method == "GET" and "_flashes" not in session
+        if conditional:
+            etag = page_etag(key)
+            if request.if_none_match:
+                fresh = request.if_none_match.contains(etag)
+            else:
+                since = request.if_modified_since
+                fresh = bool(since and changed_at and changed_at < since.replace(tzinfo=None))
+            if fresh:
+                CACHE_TOTAL.inc(cache="page", result="not_modified")
+                response = app.response_class(status=304)
+                response.set_etag(etag)
+                response.cache_control.private = True
+                response.cache_control.no_cache = True
+                return response
+
+        data = page_cache.get(key)
+        CACHE_TOTAL.inc(cache="page", result="hit" if data is not None else "miss")
+        if data is None:
+            data = build()
+            page_cache.put(key, data)
+        response = make_response(render(data))
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        if conditional:
+            # after the render, which may have created the session's CSRF token
+            response.set_etag(page_etag(key))
+            modified = last_modified(changed_at)
+            if modified:
+                response.last_modified = modified
+        return response
+
+    # ---------------------- METRICS ---------------------- #
+    # Request latency per route for /metrics, plus an opt-in cProfile dump of
+    # sampled requests slower than PROFILE_MIN_MS (open with snakeviz or pstats).
+    # Since Python 3.12 a profiler is interpreter-wide and a second enable()
+    # raises, so one request at a time is profiled and overlapping ones skip it.
+    profile_lock = threading.Lock()
+
+    def stop_profiler():
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            profile_lock.release()
+        return profiler
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        if app.config["PROFILE_REQUESTS"] and random.random() < app.config["PROFILE_SAMPLE_RATE"] \
+                and profile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # another profiler or debugger owns the hook
+                profile_lock.release()
+            else:
+                g.profiler = profiler
+
+    @app.after_request
+    def record_request_time(response):
+        started = g.pop("request_started", None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_SECONDS.observe(elapsed, method=request.method, route=route, status=str(response.status_code))
+        profiler = stop_profiler()
+        if profiler is not None:
+            ms = int(elapsed * 1000)
+            if ms >= app.config["PROFILE_MIN_MS"]:
+                os.makedirs(app.config["PROFILE_DIR"], exist_ok=True)
+                name = f"{datetime.utcnow():%Y%m%d-%H%M%S}-{request.endpoint or 'unmatched'}-{ms}ms.prof"
+                profiler.dump_stats(os.path.join(app.config["PROFILE_DIR"], name))
+        return response
+
+    @app.teardown_request
+    def stop_unfinished_profile(exc):
+        stop_profiler()  # after_request is skipped when the view raised
+
+    @app.route("/metrics")
+    def metrics_endpoint():
+        token = app.config["METRICS_TOKEN"]
+        if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            abort(401)
+        return app.response_class(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
 
     # ---------------------- ROUTES ---------------------- #
+    @app.errorhandler(413)
+    def upload_too_large(error):
+        flash(f"Upload too large: at most {app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)} MB per request.", "danger")
+        if current_user.is_authenticated:
+            return redirect(url_for("hr_dashboard" if current_user.role == "hr" else "candidate_dashboard"))
+        return redirect(url_for("index"))
+
     @app.route("/")
     def index():
         return render_template("index.html")
@@ -217,23 +799,38 @@ def create_app():
             flash("No files selected!", "warning")
             return redirect(url_for("candidate_dashboard"))
 
+        rows = []
         for file in files:
             if file and allowed_file(file.filename):
-                filename = secure_filename(f"{int(datetime.utcnow().timestamp())}_{file.filename}")
-                filepath = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-                file.save(filepath)
-                text = extract_text(filepath)
-                skills = detect_skills(text)
-                resume = Resume(
-                    user_id=current_user.id,
-                    filename=filename,
-                    text=text[:10000],
-                    detected_skills=",".join(skills),
-                    created_at=datetime.utcnow()
-                )
-                db.session.add(resume)
-        db.session.commit()
-        flash("✅ Resume(s) uploaded and analyzed successfully!", "success")
+                try:
+                    stored = save_upload(file, keep_in_memory=True)
+                except UploadRejected as exc:
+                    FILES_TOTAL.inc(source="upload", outcome="rejected")
+                    flash(str(exc), "warning")
+                    continue
+                try:
+                    text, skills = analyze_upload(stored.sha256, stored.filename, stored.data)
+                except ExtractionFailed:
+                    flash(f"Could not read {file.filename}, please upload it again.", "danger")
+                    continue
+                rows.append({
+                    "user_id": current_user.id,
+                    "filename": stored.filename,
+                    "original_filename": file.filename,
+                    "text": text[:10000],
+                    "created_at": datetime.utcnow(),
+                    "skills": skills,
+                })
+        # all resumes from the request are saved in one transaction
+        with STAGE_SECONDS.time(stage="persist", file_type="batch"):
+            failed = [row["original_filename"] for row, (_, error) in zip(rows, insert_analysed(Resume, rows)) if error]
+            db.session.commit()
+        if failed:
+            flash(f"Could not save: {', '.join(failed)}", "danger")
+        elif rows:
+            flash("✅ Resume(s) uploaded and analyzed successfully!", "success")
+        else:
+            flash("No valid resume files were uploaded.", "warning")
         return redirect(url_for("candidate_dashboard"))
 
     @app.route("/apply_job", methods=["POST"])
@@ -248,38 +845,54 @@ def create_app():
             flash("Missing Job ID or invalid file.", "warning")
             return redirect(url_for("candidate_dashboard"))
 
-        job = JobPost.query.filter_by(job_id=job_id).first()
+        job = live_jobs().filter_by(job_id=job_id).first()
         if not job:
             flash("Invalid Job ID.", "danger")
             return redirect(url_for("candidate_dashboard"))
 
-        filename = secure_filename(f"{int(datetime.utcnow().timestamp())}_{file.filename}")
-        path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-        file.save(path)
-
-        text = extract_text(path)
-        detected = detect_skills(text)
-        req_skills = detect_skills(job.description)
-        matched = set(detected).intersection(set(req_skills))
-        score = round(len(matched) / len(req_skills) * 100, 1) if req_skills else 0
+        try:
+            stored = save_upload(file, keep_in_memory=True)
+        except UploadRejected as exc:
+            FILES_TOTAL.inc(source="apply", outcome="rejected")
+            flash(str(exc), "warning")
+            return redirect(url_for("candidate_dashboard"))
+        try:
+            text, detected = analyze_upload(stored.sha256, stored.filename, stored.data, source="apply")
+        except ExtractionFailed:
+            flash(f"Could not read {file.filename}, please apply again.", "danger")
+            return redirect(url_for("candidate_dashboard"))
+        score = score_skills(detected, job_required_skills(job))
 
         application = JobApplication(
             job_id=job.id,
             candidate_id=current_user.id,
-            resume_text=text[:10000],
-            detected_skills=",".join(detected),
+            filename=stored.filename,
+            original_filename=file.filename,
+            **text_columns(text[:10000]),
+            term_vector=text_vector(text[:10000]),
+            skill_links=skill_links(ApplicationSkill, detected),
             score=score,
+            shortlisted=score >= SHORTLIST_SCORE,
             created_at=datetime.utcnow()
         )
         db.session.add(application)
+        # similarity is filled in by a background re-rank, not in this request
+        queued = queue_rerank(job)
+        touch_jobs([job.id])
         db.session.commit()
+        if queued:
+            wake_workers()
         flash(f"✅ Applied successfully for {job.title}! ATS Score: {score}%", "success")
         return redirect(url_for("candidate_dashboard"))
 
     @app.route("/uploads/<filename>")
     @login_required
     def uploaded_file(filename):
-        return send_from_directory(app.config["UPLOAD_FOLDER"], filename)
+        # files are stored as <sha256>.<ext>; ?name= is the name it was uploaded under
+        name = request.args.get("name")
+        if not name or file_type(name) != file_type(filename):
+            name = None
+        return send_from_directory(app.config["UPLOAD_FOLDER"], filename, download_name=name)
 
     # ---------------- HR Dashboard ---------------- #
     @app.route("/hr", methods=["GET", "POST"])
@@ -301,7 +914,10 @@ def create_app():
                 description=job_form.description.data,
                 hr_id=current_user.id
             )
+            set_job_profile(job)
             db.session.add(job)
+            db.session.flush()
+            touch_jobs([job.id])
             db.session.commit()
             flash(f"Job created successfully! Job ID: {job_id}", "success")
             return redirect(url_for("hr_dashboard"))
@@ -319,7 +935,7 @@ def create_app():
             # If HR provided an existing job id, link to that job, else create TEMP job or create new real job
             job_to_use = None
             if target_job_id:
-                job_to_use = JobPost.query.filter_by(job_id=target_job_id, hr_id=current_user.id).first()
+                job_to_use = live_jobs().filter_by(job_id=target_job_id, hr_id=current_user.id).first()
             if not job_to_use:
                 # create a TEMP job entry (so results are tied to a JobPost)
                 job_to_use = JobPost(
@@ -328,128 +944,90 @@ def create_app():
                     description=description_text,
                     hr_id=current_user.id
                 )
+                set_job_profile(job_to_use)
                 db.session.add(job_to_use)
-                db.session.commit()
+                db.session.flush()
 
-            processed_apps = []
+            # scored against the submitted description, parsed once per batch
+            _, req_skills = profile_description(description_text)
+            batch = AnalysisBatch(
+                batch_id=uuid.uuid4().hex,
+                hr_id=current_user.id,
+                job_id=job_to_use.id,
+                required_skills=",".join(req_skills),
+                total=0,
+            )
+            db.session.add(batch)
+            # only the file writes happen in the request; analysis is queued
+            rejected = []
             for file in files:
                 if file and allowed_file(file.filename):
-                    filename = secure_filename(f"{int(datetime.utcnow().timestamp())}_{file.filename}")
-                    path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-                    file.save(path)
-                    text = extract_text(path)
-                    detected = detect_skills(text)
-                    req_skills = detect_skills(description_text)
-                    matched = set(detected).intersection(set(req_skills))
-                    score = round(len(matched) / len(req_skills) * 100, 1) if req_skills else 0
-
-                    # Create Resume record (uploaded by HR)
-                    resume = Resume(
-                        user_id=current_user.id,
-                        filename=filename,
-                        text=text[:10000],
-                        detected_skills=",".join(detected),
-                        created_at=datetime.utcnow()
-                    )
-                    db.session.add(resume)
-                    db.session.commit()
-
-                    # Save application and link to job_to_use
-                    application = JobApplication(
-                        job_id=job_to_use.id,
-                        candidate_id=current_user.id,  # HR uploaded - placeholder; you'll replace with real candidate link later
-                        resume_text=text[:10000],
-                        detected_skills=f"{filename}||{','.join(detected)}",  # store filename||skills for template convenience
-                        score=score,
-                        shortlisted=(score >= 60),
-                        created_at=datetime.utcnow()
-                    )
-                    db.session.add(application)
-                    db.session.commit()
-                    processed_apps.append((application, filename))
-            flash(f"Bulk resumes analyzed successfully! {len(processed_apps)} processed.", "success")
-            return redirect(url_for("hr_dashboard"))
+                    try:
+                        stored = save_upload(file)
+                    except UploadRejected as exc:
+                        FILES_TOTAL.inc(source="bulk", outcome="rejected")
+                        rejected.append(str(exc))
+                        continue
+                    db.session.add(AnalysisTask(batch=batch, filename=stored.filename, sha256=stored.sha256,
+                                                original_filename=file.filename))
+                    batch.total += 1
+            touch_jobs([job_to_use.id])
+            db.session.commit()
+            wake_workers()
+            flash(f"Bulk upload queued: {batch.total} file(s). Batch ID: {batch.batch_id}", "success")
+            if rejected:
+                flash(f"Skipped {len(rejected)} file(s): " + "; ".join(rejected[:5]), "warning")
+            return redirect(url_for("bulk_results_page", batch=batch.batch_id))
 
         # Show jobs and bulk results (bulk results tied to JobPost.job_id starting with 'TEMP-' OR real jobs)
-        jobs = JobPost.query.filter_by(hr_id=current_user.id).order_by(JobPost.created_at.desc()).all()
-
-        # Show bulk results for TEMP jobs created by this HR
-        # Join JobApplication -> JobPost and pick job_posts where job_post.job_id like 'TEMP-%'
-        bulk_q = (
-            db.session.query(JobApplication, JobPost)
-            .join(JobPost, JobApplication.job_id == JobPost.id)
-            .filter(JobPost.hr_id == current_user.id, JobPost.job_id.like("TEMP-%"))
-            .order_by(JobApplication.created_at.desc())
-            .all()
-        )
-        # Build processed list of dicts for template
-        bulk_results = []
-        for app_row, job_row in bulk_q:
-            # detected_skills stored as 'filename||skill1,skill2'
-            filename = None
-            skills_str = ""
-            if app_row.detected_skills and "||" in app_row.detected_skills:
-                parts = app_row.detected_skills.split("||", 1)
-                filename = parts[0]
-                skills_str = parts[1]
-            else:
-                skills_str = app_row.detected_skills or ""
-            bulk_results.append({
-                "id": app_row.id,
-                "job_id": job_row.job_id,
-                "resume_filename": filename,
-                "preview": (app_row.resume_text[:200] + "...") if app_row.resume_text else "",
-                "skills": skills_str.split(",") if skills_str else [],
-                "score": app_row.score,
-                "shortlisted": app_row.shortlisted,
-                "created_at": app_row.created_at
-            })
+        def dashboard_data():
+            jobs = [
+                {"job_id": job.job_id, "title": job.title, "description": job.description}
+                for job in live_jobs().filter_by(hr_id=current_user.id).order_by(JobPost.created_at.desc())
+            ]
+            # Latest bulk results for TEMP jobs created by this HR; the full list is
+            # paginated on the bulk results page
+            bulk_results, more_bulk_results = application_page(
+                bulk_filters(), limit=app.config["PAGE_SIZE"]
+            )
+            return {"jobs": jobs, "bulk_results": bulk_results, "more_bulk_results": more_bulk_results is not None}
 
-        return render_template(
-            "hr_dashboard.html",
-            job_form=job_form,
-            bulk_form=bulk_form,
-            jobs=jobs,
-            bulk_results=bulk_results
+        return cached_page(
+            ("dashboard", current_user.id, current_user.jobs_revision), current_user.jobs_changed_at,
+            dashboard_data,
+            lambda data: render_template("hr_dashboard.html", job_form=job_form, bulk_form=bulk_form, **data),
         )
 
+    def bulk_filters():
+        return [JobPost.hr_id == current_user.id, is_temp_job(), JobPost.deleted_at.is_(None)]
+
     # -------------- View candidates for a given job --------------
     @app.route("/hr/job/<job_id>/candidates")
     @login_required
     def view_candidates(job_id):
         if current_user.role != "hr":
             abort(403)
-        job = JobPost.query.filter_by(job_id=job_id, hr_id=current_user.id).first_or_404()
-        apps = JobApplication.query.filter_by(job_id=job.id).order_by(JobApplication.created_at.desc()).all()
-
-        # build simplified application view data
-        processed = []
-        for a in apps:
-            # try to find filename if stored in detected_skills
-            filename = None
-            skills = []
-            if a.detected_skills and "||" in a.detected_skills:
-                fn, skills_str = a.detected_skills.split("||", 1)
-                filename = fn
-                skills = skills_str.split(",") if skills_str else []
-            else:
-                skills = (a.detected_skills or "").split(",") if a.detected_skills else []
-            # Try to get candidate user (might be HR id if bulk uploaded)
-            cand_user = None
-            if a.candidate_id:
-                cand_user = User.query.get(a.candidate_id)
-            processed.append({
-                "id": a.id,
-                "candidate": cand_user.username if cand_user else "N/A",
-                "email": cand_user.email if cand_user else "N/A",
-                "filename": filename,
-                "preview": (a.resume_text[:200] + "...") if a.resume_text else "",
-                "skills": skills,
-                "score": a.score,
-                "shortlisted": a.shortlisted,
-                "created_at": a.created_at
-            })
-        return render_template("hr_candidates.html", job=job, applications=processed)
+        job = own_job_or_404(job_id)
+        # ?skills=kafka,terraform keeps applicants that have every listed skill
+        required = [s.strip().lower() for s in request.args.get("skills", "").split(",") if s.strip()]
+        sort = request.args.get("sort", "date")
+        after = request.args.get("after")
+
+        def candidates_data():
+            filters = [JobApplication.job_id == job.id]
+            if required:
+                filters.append(JobApplication.id.in_(applications_with_skills(required)))
+            # candidate name/email come from the same joined query (bulk uploads show the HR user)
+            processed, next_cursor = application_page(filters, sort=sort, cursor=after, limit=app.config["PAGE_SIZE"])
+            return {"applications": processed, "next_cursor": next_cursor, "rescoring": rescore_progress(job)}
+
+        return cached_page(
+            ("candidates", current_user.id, job.job_id, job.created_at, job.revision, tuple(required), sort, after),
+            job.changed_at,
+            candidates_data,
+            lambda data: render_template("hr_candidates.html", job=job, skills_filter=", ".join(required),
+                                         sort=sort, **data),
+        )
     # -------------- Bulk Results (Separate Page) --------------
     @app.route("/hr/bulk_results")
     @login_required
@@ -457,36 +1035,183 @@ def create_app():
         if current_user.role != "hr":
             abort(403)
 
-        # Fetch TEMP job’s bulk results
-        bulk_q = (
-            db.session.query(JobApplication, JobPost)
-            .join(JobPost, JobApplication.job_id == JobPost.id)
-            .filter(JobPost.hr_id == current_user.id, JobPost.job_id.like("TEMP-%"))
-            .order_by(JobApplication.created_at.desc())
+        # A just-queued batch: show its finished rows and let the page poll for the rest
+        batch_id = request.args.get("batch")
+        if batch_id:
+            batch = AnalysisBatch.query.filter_by(batch_id=batch_id, hr_id=current_user.id).first_or_404()
+            return cached_page(
+                ("batch", current_user.id, batch.batch_id, current_user.jobs_revision), current_user.jobs_changed_at,
+                lambda: {"results": [r for r in batch_task_rows(batch) if r["status"] == "done"],
+                         "batch": batch_progress(batch)},
+                lambda data: render_template("bulk_results.html", **data),
+            )
+
+        # Fetch TEMP job’s bulk results, one page at a time
+        sort = request.args.get("sort", "date")
+        after = request.args.get("after")
+
+        def bulk_data():
+            results, next_cursor = application_page(
+                bulk_filters(), sort=sort, cursor=after, limit=app.config["PAGE_SIZE"]
+            )
+            return {"results": results, "next_cursor": next_cursor}
+
+        return cached_page(
+            ("bulk", current_user.id, current_user.jobs_revision, sort, after), current_user.jobs_changed_at,
+            bulk_data,
+            lambda data: render_template("bulk_results.html", batch=None, sort=sort, **data),
+        )
+
+    # -------------- Bulk batch progress (polled by bulk_results.html) --------------
+    def batch_progress(batch):
+        counts = dict(
+            db.session.query(AnalysisTask.status, db.func.count(AnalysisTask.id))
+            .filter(AnalysisTask.batch_id == batch.id)
+            .group_by(AnalysisTask.status)
             .all()
         )
+        finished = counts.get("done", 0) + counts.get("failed", 0)
+        return {
+            "batch_id": batch.batch_id,
+            "total": batch.total,
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "complete": finished >= batch.total,
+        }
 
-        results = []
-        for app_row, job_row in bulk_q:
-            filename = None
-            skills_str = ""
-            if app_row.detected_skills and "||" in app_row.detected_skills:
-                parts = app_row.detected_skills.split("||", 1)
-                filename = parts[0]
-                skills_str = parts[1]
+    def batch_task_rows(batch, since=None):
+        q = AnalysisTask.query.filter(
+            AnalysisTask.batch_id == batch.id, AnalysisTask.status.in_(("done", "failed"))
+        )
+        if since:
+            q = q.filter(AnalysisTask.finished_at >= since)
+        rows = []
+        for task in q.order_by(AnalysisTask.finished_at, AnalysisTask.id).all():
+            a = task.application
+            rows.append({
+                "id": task.id,
+                "status": task.status,
+                "error": task.error,
+                "filename": task.original_filename or task.filename,
+                "resume_filename": task.filename,
+                "download_url": url_for("uploaded_file", filename=task.filename, name=task.original_filename),
+                "score": a.score if a else None,
+                "shortlisted": a.shortlisted if a else False,
+                "preview": (a.preview + "...") if a and a.preview else "",
+                "skills": a.skill_names if a else [],
+                "finished_at": task.finished_at.isoformat() if task.finished_at else None,
+            })
+        return rows
+
+    @app.route("/hr/batch/<batch_id>/status")
+    @login_required
+    def batch_status(batch_id):
+        if current_user.role != "hr":
+            abort(403)
+        batch = AnalysisBatch.query.filter_by(batch_id=batch_id, hr_id=current_user.id).first_or_404()
+        # `since` is the finished_at of the newest row the client has; rows with the
+        # same timestamp are sent again and de-duplicated by id on the page
+        since = request.args.get("since")
+        try:
+            since = datetime.fromisoformat(since) if since else None
+        except ValueError:
+            abort(400)
+        return jsonify(progress=batch_progress(batch), results=batch_task_rows(batch, since))
 
+    @app.route("/hr/job/<job_id>/matches")
+    @login_required
+    def job_matches(job_id):
+        """Top-K stored resumes for the job's required skills (candidate uploads and own bulk uploads)."""
+        if current_user.role != "hr":
+            abort(403)
+        job = own_job_or_404(job_id)
+        k = max(1, min(request.args.get("k", 20, type=int), 200))
+        started = time.perf_counter()
+        # resumes saved since the last search are indexed here, not by the
+        # uploads, so only this route waits for a (re)build
+        resume_index.refresh()
+        required = job_required_skills(job)
+        if db.session.is_modified(job):
+            # profiled just now (saved before profiles, or a new taxonomy): keep it
+            db.session.commit()
+        hits = resume_index.top_k(required, k=k, hr_id=current_user.id)
+
+        details = {
+            row.id: row for row in
+            db.session.query(Resume.id, Resume.filename, Resume.original_filename, Resume.created_at,
+                             User.username, User.email)
+            .join(User, User.id == Resume.user_id)
+            .filter(Resume.id.in_([resume_id for resume_id, _ in hits]))
+        }
+        results = []
+        for resume_id, matched in hits:
+            row = details.get(resume_id)
+            if row is None:  # deleted since it was indexed
+                continue
             results.append({
-                "id": app_row.id,
-                "job_id": job_row.job_id,
-                "resume_filename": filename,
-                "score": app_row.score,
-                "shortlisted": app_row.shortlisted,
-                "preview": (app_row.resume_text[:200] + "...") if app_row.resume_text else "",
-                "skills": skills_str.split(",") if skills_str else [],
-                "created_at": app_row.created_at
+                "resume_id": resume_id,
+                "candidate": row.username,
+                "email": row.email,
+                "filename": row.original_filename or row.filename,
+                "download_url": url_for("uploaded_file", filename=row.filename, name=row.original_filename),
+                "matched": matched,
+                "score": score_skills(matched, required),
+                "created_at": row.created_at.isoformat() if row.created_at else None,
             })
+        return jsonify(job_id=job.job_id, required=required, results=results,
+                       took_ms=round((time.perf_counter() - started) * 1000, 2))
+
+    @app.route("/hr/search")
+    @login_required
+    def search_resumes():
+        """Full-text search over resume text: ?q=&scope=applications|resumes&job=&page=&limit="""
+        if current_user.role != "hr":
+            abort(403)
+        query = request.args.get("q", "").strip()
+        scope = request.args.get("scope", "applications")
+        if scope not in SEARCH_SCOPES:
+            abort(400)
+        page = max(1, request.args.get("page", 1, type=int))
+        limit = max(1, min(request.args.get("limit", 20, type=int), 100))
+        started = time.perf_counter()
+        results, has_more = search_page(query, current_user.id, scope=scope,
+                                        job_code=request.args.get("job") or None, page=page, limit=limit)
+        return jsonify(query=query, scope=scope, page=page, results=results,
+                       next_page=page + 1 if has_more else None,
+                       took_ms=round((time.perf_counter() - started) * 1000, 2))
 
-        return render_template("bulk_results.html", results=results)
+    @app.route("/hr/job/<job_id>/export")
+    @login_required
+    def export_candidates(job_id):
+        """A job's applicants as CSV or Parquet: ?format=csv|parquet&min_score=&shortlisted=1|0"""
+        if current_user.role != "hr":
+            abort(403)
+        job = own_job_or_404(job_id)
+        fmt = request.args.get("format", "csv")
+        if fmt not in EXPORT_FORMATS:
+            abort(400)
+        chunks = export_chunks(
+            job,
+            min_score=request.args.get("min_score", type=float),
+            shortlisted={"1": True, "0": False}.get(request.args.get("shortlisted")),
+            chunk_size=app.config["EXPORT_CHUNK_SIZE"],
+        )
+        name = f"{job.job_id}-applicants.{fmt}"
+        if fmt == "csv":
+            # rows are read and sent a chunk at a time while the response streams
+            return Response(stream_with_context(csv_stream(chunks)), mimetype="text/csv",
+                            headers={"Content-Disposition": f'attachment; filename="{name}"'})
+        # Parquet's footer is written last, so the file is built on disk first
+        out = tempfile.TemporaryFile()
+        try:
+            write_parquet(chunks, out)
+        except ExportUnavailable as exc:
+            out.close()
+            return jsonify(error=str(exc)), 501
+        out.seek(0)
+        return send_file(out, mimetype="application/vnd.apache.parquet", as_attachment=True, download_name=name)
 
 
 
@@ -496,13 +1221,23 @@ def create_app():
     def edit_job(job_id):
         if current_user.role != "hr":
             abort(403)
-        job = JobPost.query.filter_by(job_id=job_id, hr_id=current_user.id).first_or_404()
+        job = own_job_or_404(job_id)
         form = JobForm(obj=job)
         if form.validate_on_submit():
+            old_hash, old_skills = job.description_hash, job_required_skills(job)
             job.title = form.title.data
             job.description = form.description.data
+            new_skills = set_job_profile(job)
+            batch, queued = None, 0
+            if job.description_hash != old_hash:
+                # applicants are re-scored in the background, not in this request
+                batch, queued = queue_rescore(job, old_skills, new_skills)
+            touch_jobs([job.id])
             db.session.commit()
-            flash("Job updated successfully.", "success")
+            if batch:
+                wake_workers()
+            flash("Job updated successfully." + (f" Re-scoring {queued} applicant(s) in the background." if queued else ""),
+                  "success")
             return redirect(url_for("hr_dashboard"))
         # pre-populate and show edit page (reuse hr_dashboard but show edit modal or separate template)
         return render_template("hr_edit_job.html", form=form, job=job)
@@ -513,19 +1248,33 @@ def create_app():
     def delete_job(job_id):
         if current_user.role != "hr":
             abort(403)
-        job = JobPost.query.filter_by(job_id=job_id, hr_id=current_user.id).first_or_404()
+        job = own_job_or_404(job_id)
 
-        # Deleting a job will NOT delete candidate resumes from uploads folder, but will remove job row
-        # and job applications: remove JobApplication rows linked to this job
-        JobApplication.query.filter_by(job_id=job.id).delete()
-        db.session.delete(job)
+        # The job disappears now; its applications, tasks, bulk-uploaded resume
+        # copies and then unused files are removed in the background (reclaim.py).
+        # Candidates' own resumes stay.
+        mark_jobs_deleted([job.id])
         db.session.commit()
+        wake_reclaimer()
         flash(f"Job {job_id} and its applications have been deleted.", "info")
         return redirect(url_for("hr_dashboard"))
 
     # ---------------------- SAFE DB INIT ---------------------- #
     with app.app_context():
-        db.create_all()
+        apply_sqlite_pragmas(db.engine, app.config["SQLITE_PRAGMAS"])
+        ensure_schema()
+
+    if app.config["PRELOAD_NLP"]:
+        # load in the master before gunicorn --preload forks, and keep the
+        # collector from touching (and so copying) those pages in the workers
+        get_nlp()
+        gc.freeze()
+
+    if app.config["ANALYSIS_QUEUE_WORKERS"] > 0:
+        start_workers(app, handle_tasks)
+        # clean-up runs next to the queue; the skill index must forget removed resumes
+        if app.config["RECLAIM_INTERVAL_SECONDS"] > 0:
+            start_reclaimer(app, on_resumes_removed=resume_index.rebuild)
 
     return app
 
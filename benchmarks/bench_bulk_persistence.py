@@ -0,0 +1,103 @@
+"""Commits and wall time to store one bulk batch of analysed resumes.
+
+"per file" is the old bulk upload loop: add a Resume and commit, add a
+JobApplication and commit, for every file. "one transaction" is
+persistence.insert_analysed for the whole batch followed by a single commit.
+
+    python benchmarks/bench_bulk_persistence.py --files 10 100 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ANALYSIS_QUEUE_WORKERS", "0")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import event  # noqa: E402
+
+from benchmarks.corpus import resume_text  # noqa: E402
+from config import Config  # noqa: E402
+from models import (  # noqa: E402
+    db, User, Resume, JobPost, JobApplication, ResumeSkill, ApplicationSkill, skill_links, text_columns
+)
+from persistence import insert_analysed  # noqa: E402
+
+
+def analysed_batch(count, vocab):
+    batch = []
+    for i in range(count):
+        text = resume_text(1, vocab, seed=i)
+        batch.append((f"{i}.pdf", text, [t for t in vocab[i % 40:i % 40 + 8]], i % 101))
+    return batch
+
+
+def per_file(hr_id, job_id, batch):
+    for filename, text, detected, score in batch:
+        db.session.add(Resume(user_id=hr_id, filename=filename, **text_columns(text),
+                              skill_links=skill_links(ResumeSkill, detected),
+                              created_at=datetime.utcnow()))
+        db.session.commit()
+        db.session.add(JobApplication(job_id=job_id, candidate_id=hr_id, filename=filename,
+                                      **text_columns(text), score=score, shortlisted=score >= 60,
+                                      skill_links=skill_links(ApplicationSkill, detected),
+                                      created_at=datetime.utcnow()))
+        db.session.commit()
+
+
+def one_transaction(hr_id, job_id, batch):
+    now = datetime.utcnow()
+    insert_analysed(Resume, [
+        {"user_id": hr_id, "filename": filename, "text": text, "created_at": now, "skills": detected}
+        for filename, text, detected, _ in batch
+    ])
+    insert_analysed(JobApplication, [
+        {"job_id": job_id, "candidate_id": hr_id, "filename": filename, "text": text,
+         "score": score, "shortlisted": score >= 60, "created_at": now, "skills": detected}
+        for filename, text, detected, score in batch
+    ])
+    db.session.commit()
+
+
+def run(folder, name, store, batch):
+    Config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(folder, f"{name}-{len(batch)}.db")
+    from app import create_app
+    app = create_app()
+    commits = [0]
+    with app.app_context():
+        event.listen(db.engine, "commit", lambda conn: commits.__setitem__(0, commits[0] + 1))
+        hr = User(username="hr", email="hr@example.com", password_hash="-", role="hr")
+        db.session.add(hr)
+        db.session.flush()
+        job = JobPost(job_id="TEMP-1", title="Bulk Upload", description="-", hr_id=hr.id)
+        db.session.add(job)
+        db.session.commit()
+        commits[0] = 0
+        start = time.perf_counter()
+        store(hr.id, job.id, batch)
+        elapsed = time.perf_counter() - start
+    return commits[0], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, nargs="+", default=[10, 100, 500])
+    args = parser.parse_args()
+
+    from benchmarks.bench_skill_matcher import load_vocab
+    vocab = list(load_vocab())
+
+    print(f"{'files':>6} {'strategy':<16} {'commits':>8} {'seconds':>8} {'files/s':>8}")
+    with tempfile.TemporaryDirectory() as folder:
+        for count in args.files:
+            batch = analysed_batch(count, vocab)
+            for name, store in (("per file", per_file), ("one transaction", one_transaction)):
+                commits, elapsed = run(folder, name.replace(" ", "-"), store, batch)
+                print(f"{count:>6} {name:<16} {commits:>8} {elapsed:>8.3f} {count / elapsed:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Bulk analysis throughput (resumes/sec) against process pool size.
+
+Generates a mixed PDF/DOCX corpus, then runs analysis.analyze_files over it
+the same way the HR bulk upload does: inline for one worker, chunked over a
+warmed-up ProcessPoolExecutor otherwise.
+
+    python benchmarks/bench_bulk_throughput.py --files 100 --workers 1 2 4 8
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis import analyze_files, init_worker, load_nlp  # noqa: E402
+from benchmarks.bench_skill_matcher import load_vocab  # noqa: E402
+from benchmarks.corpus import write_corpus  # noqa: E402
+from skills import SkillMatcher  # noqa: E402
+
+
+def run(paths, required, workers, chunk_size, vocab, nlp_mode):
+    if workers <= 1:
+        matcher, nlp = SkillMatcher(vocab), load_nlp(nlp_mode)
+        start = time.perf_counter()
+        analyze_files(paths, required, matcher=matcher, nlp=nlp)
+        return time.perf_counter() - start
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker,
+                             initargs=(SkillMatcher(vocab).spec(), nlp_mode)) as pool:
+        # warm up every worker so model loading is not part of the measurement
+        list(pool.map(analyze_files, [paths[:1]] * workers, [required] * workers))
+        chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+        start = time.perf_counter()
+        for future in [pool.submit(analyze_files, chunk, required) for chunk in chunks]:
+            future.result()
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--chunk-size", type=int, default=4)
+    parser.add_argument("--nlp-mode", default="fast")
+    args = parser.parse_args()
+
+    vocab = load_vocab()
+    required = list(vocab[:25])
+    with tempfile.TemporaryDirectory() as folder:
+        paths = write_corpus(folder, args.files, args.pages, vocab, kinds=("docx", "pdf"))
+        print(f"{args.files} files x {args.pages} pages, chunk size {args.chunk_size}")
+        print(f"{'workers':>7} {'seconds':>8} {'resumes/s':>10} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            elapsed = run(paths, required, workers, args.chunk_size, vocab, args.nlp_mode)
+            baseline = baseline or elapsed
+            print(f"{workers:>7} {elapsed:>8.2f} {args.files / elapsed:>10.1f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Wall time and peak memory of DOCX text extraction on large documents.
+
+Each measurement runs in a fresh process, as in bench_pdf_extraction. The
+documents have a header, a skills table and ``--pages`` pages of body text.
+"legacy" is the previous implementation (python-docx ``Document(path)`` and
+its body paragraphs, which skips the header and the table), "streamed" is
+analysis.extract_text_from_docx with the app's character budget and
+"unbudgeted" the same without one, i.e. the whole document.
+
+    python benchmarks/bench_docx_extraction.py --pages 10 100 500
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document  # noqa: E402
+
+from analysis import extract_text_from_docx  # noqa: E402
+from benchmarks.corpus import resume_text  # noqa: E402
+from config import Config  # noqa: E402
+
+VOCAB = ["python", "docker", "kubernetes", "terraform", "kafka", "react", "aws"]
+
+
+def write_layout_docx(path, pages):
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Jane Doe | jane@example.com | +1 555 0100"
+    table = doc.add_table(rows=len(VOCAB), cols=2)
+    for row, skill in zip(table.rows, VOCAB):
+        row.cells[0].text = skill
+        row.cells[1].text = "5 years"
+    for line in resume_text(pages, VOCAB).splitlines():
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+def legacy_extract(path):
+    return "\n".join([p.text for p in Document(path).paragraphs])
+
+
+IMPLEMENTATIONS = {
+    "legacy": legacy_extract,
+    "streamed": lambda path: extract_text_from_docx(path, max_chars=Config.EXTRACT_MAX_CHARS),
+    "unbudgeted": extract_text_from_docx,
+}
+
+
+def peak_rss():
+    # ru_maxrss survives exec on Linux, so a spawned child would report the
+    # parent's peak (it grows while writing the documents); VmHWM does not
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def measure(name, path, queue):
+    fn = IMPLEMENTATIONS[name]
+    tracemalloc.start()
+    start = time.perf_counter()
+    text = fn(path)
+    elapsed = time.perf_counter() - start
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    queue.put((elapsed, peak_rss(), traced_peak, len(text), "5 years" in text))
+
+
+def run_isolated(name, path):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    proc = context.Process(target=measure, args=(name, path, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 500])
+    args = parser.parse_args()
+
+    print(f"budget: {Config.EXTRACT_MAX_CHARS} chars; 'table' = skills table text found")
+    print(f"{'pages':>5} {'impl':>10} {'seconds':>8} {'peak RSS MB':>12} {'traced MB':>10} {'chars':>9} {'table':>6}")
+    with tempfile.TemporaryDirectory() as folder:
+        for pages in args.pages:
+            path = os.path.join(folder, f"resume_{pages}.docx")
+            write_layout_docx(path, pages)
+            for name in IMPLEMENTATIONS:
+                elapsed, rss, traced, chars, table = run_isolated(name, path)
+                print(f"{pages:>5} {name:>10} {elapsed:>8.2f} {rss / 2**20:>12.1f} "
+                      f"{traced / 2**20:>10.1f} {chars:>9} {'yes' if table else 'no':>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Time and peak Python memory of GET /hr/job/<id>/export for a large job.
+
+The response is consumed chunk by chunk and thrown away, the way a client
+saving it to disk would, so the peak is what the server holds at once. For
+comparison, "fetch all" loads the same rows with a plain .all() query.
+
+    python benchmarks/bench_export.py --applications 10000 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ANALYSIS_QUEUE_WORKERS", "0")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from config import Config  # noqa: E402
+from models import db, User, JobPost, JobApplication, ApplicationSkill, skill_ids  # noqa: E402
+
+
+def traced(fn):
+    """Run ``fn`` untraced for the time, then again under tracemalloc for the peak."""
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--skills", type=int, default=8, help="skill links per application")
+    parser.add_argument("--batch", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        Config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(folder, "export.db")
+        from app import create_app
+        app = create_app()
+        with app.app_context():
+            db.session.add(User(id=1, username="hr", email="hr@example.com", password_hash="-", role="hr"))
+            db.session.execute(db.insert(JobPost), [
+                dict(id=i + 1, job_id=f"JOB-{n}", title="Bench", description="-", hr_id=1)
+                for i, n in enumerate(args.applications)
+            ])
+            ids = list(skill_ids([f"skill{i}" for i in range(50)]).values())
+            for job, count in enumerate(args.applications, start=1):
+                for first in range(0, count, args.batch):
+                    rows = range(first, min(first + args.batch, count))
+                    new_ids = db.session.execute(
+                        db.insert(JobApplication).returning(JobApplication.id, sort_by_parameter_order=True),
+                        [dict(job_id=job, candidate_id=1, filename=f"{i}.pdf", score=i % 101,
+                              similarity=(i % 97) / 97, shortlisted=i % 101 >= 60) for i in rows],
+                    ).scalars().all()
+                    db.session.execute(db.insert(ApplicationSkill), [
+                        dict(application_id=a, skill_id=ids[(a + k) % len(ids)], rank=k)
+                        for a in new_ids for k in range(args.skills)
+                    ])
+            db.session.commit()
+
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session["_user_id"] = "1"
+            session["_fresh"] = True
+
+        def export(url):
+            def run():
+                response = client.get(url, buffered=False)
+                assert response.status_code == 200, response.status_code
+                size = 0
+                for piece in response.iter_encoded():
+                    size += len(piece)
+                response.close()
+                return size
+            return run
+
+        def fetch_all(job):
+            def run():
+                with app.app_context():  # a fresh session each time
+                    return len(JobApplication.query.filter_by(job_id=job).all())
+            return run
+
+        print(f"{'applications':>12} {'variant':<16} {'seconds':>8} {'MB out':>8} {'peak MB':>8}")
+        for job, count in enumerate(args.applications, start=1):
+            _, seconds, peak = traced(fetch_all(job))
+            print(f"{count:>12} {'fetch all':<16} {seconds:>8.2f} {'':>8} {peak:>8.1f}")
+            for label, query in (("csv", ""), ("csv score>=60", "&min_score=60")):
+                size, seconds, peak = traced(export(f"/hr/job/JOB-{count}/export?format=csv{query}"))
+                print(f"{count:>12} {label:<16} {seconds:>8.2f} {size / 1e6:>8.1f} {peak:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
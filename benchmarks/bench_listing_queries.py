@@ -0,0 +1,180 @@
+"""SQL latency of the listing routes on a large database, before and after
+the listing indexes and the SQLite connection pragmas.
+
+Seeds one SQLite file with --applications rows, then serves the same set of
+GET requests from two copies of it: "before" without the composite indexes
+and with SQLite defaults, "after" with both. Time spent inside SQL is
+measured with engine events, so template rendering is not counted.
+
+    python benchmarks/bench_listing_queries.py --applications 100000
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ANALYSIS_QUEUE_WORKERS", "0")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import event  # noqa: E402
+
+from benchmarks.corpus import resume_text  # noqa: E402
+from config import Config  # noqa: E402
+from models import (  # noqa: E402
+    db, User, Resume, JobPost, JobApplication, Skill, ApplicationSkill, PREVIEW_CHARS, store_texts
+)
+
+LISTING_INDEXES = (
+    "ix_resume_user_created",
+    "ix_job_post_hr_created",
+    "ix_job_post_hr_job_id",
+    "ix_job_application_job_created",
+    "ix_job_application_job_score",
+    "ix_job_application_candidate_created",
+)
+TUNED_PRAGMAS = dict(Config.SQLITE_PRAGMAS)
+
+
+def make_app(path, pragmas):
+    Config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + path
+    Config.SQLITE_PRAGMAS = pragmas
+    from app import create_app
+    return create_app()
+
+
+def seed(path, args, vocab):
+    app = make_app(path, {})
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    texts = [resume_text(1, vocab, seed=i) for i in range(50)]
+    with app.app_context():
+        with db.engine.begin() as conn:
+            for name in LISTING_INDEXES:
+                conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+
+        users = [dict(id=i + 1, username=f"user{i}", email=f"user{i}@example.com",
+                      password_hash="-", role="hr" if i < args.hrs else "candidate")
+                 for i in range(args.hrs + args.candidates)]
+        db.session.execute(db.insert(User), users)
+
+        jobs = [dict(id=i + 1, job_id=f"TEMP-{i:06d}" if i % 7 == 0 else f"JOB-{i:06d}",
+                     title=f"Job {i}", description="python docker kubernetes",
+                     hr_id=1 + i % args.hrs, created_at=start + timedelta(hours=i))
+                for i in range(args.jobs)]
+        db.session.execute(db.insert(JobPost), jobs)
+
+        db.session.execute(db.insert(Skill), [dict(id=i + 1, name=s) for i, s in enumerate(vocab)])
+        text_ids = store_texts(texts)
+
+        candidate_ids = range(args.hrs + 1, args.hrs + args.candidates + 1)
+        for offset in range(0, args.applications, 10000):
+            apps, links, resumes = [], [], []
+            for i in range(offset, min(offset + 10000, args.applications)):
+                created = start + timedelta(minutes=i)
+                candidate = rng.choice(candidate_ids)
+                apps.append(dict(id=i + 1, job_id=rng.randint(1, args.jobs), candidate_id=candidate,
+                                 text_id=text_ids[i % len(texts)], preview=texts[i % len(texts)][:PREVIEW_CHARS],
+                                 score=rng.randint(0, 100),
+                                 shortlisted=False, created_at=created, filename=f"{i}.pdf"))
+                links.extend(dict(application_id=i + 1, skill_id=s, rank=r)
+                             for r, s in enumerate(rng.sample(range(1, len(vocab) + 1), 3)))
+                if i % 5 == 0:
+                    resumes.append(dict(filename=f"{i}.pdf", text_id=text_ids[i % len(texts)],
+                                        preview=texts[i % len(texts)][:PREVIEW_CHARS],
+                                        user_id=candidate, created_at=created))
+            db.session.execute(db.insert(JobApplication), apps)
+            db.session.execute(db.insert(ApplicationSkill), links)
+            db.session.execute(db.insert(Resume), resumes)
+        db.session.commit()
+
+
+def routes(app, hr_id, candidate_id):
+    with app.app_context():
+        job = JobPost.query.filter(JobPost.hr_id == hr_id, JobPost.job_id.like("JOB-%")).first()
+    return [
+        ("hr dashboard", hr_id, "/hr"),
+        ("candidates by date", hr_id, f"/hr/job/{job.job_id}/candidates"),
+        ("candidates by score", hr_id, f"/hr/job/{job.job_id}/candidates?sort=score"),
+        ("candidates skill filter", hr_id, f"/hr/job/{job.job_id}/candidates?skills=python,docker"),
+        ("bulk results", hr_id, "/hr/bulk_results"),
+        ("candidate dashboard", candidate_id, "/candidate"),
+    ]
+
+
+def measure(app, args):
+    sql_time = [0.0]
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start"] = time.perf_counter()
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        sql_time[0] += time.perf_counter() - conn.info.pop("query_start")
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", before)
+        event.listen(db.engine, "after_cursor_execute", after)
+
+    client = app.test_client()
+    results = {}
+    for label, user_id, url in routes(app, 1, args.hrs + 1):
+        with client.session_transaction() as session:
+            session["_user_id"] = str(user_id)
+            session["_fresh"] = True
+        samples = []
+        for _ in range(args.repeat):
+            sql_time[0] = 0.0
+            response = client.get(url)
+            assert response.status_code == 200, (url, response.status_code)
+            samples.append(sql_time[0] * 1000)
+        results[label] = statistics.median(samples)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--applications", type=int, default=100000)
+    parser.add_argument("--jobs", type=int, default=400)
+    parser.add_argument("--hrs", type=int, default=20)
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from benchmarks.bench_skill_matcher import load_vocab
+    vocab = list(load_vocab())
+
+    with tempfile.TemporaryDirectory() as folder:
+        seeded = os.path.join(folder, "seed.db")
+        started = time.perf_counter()
+        seed(seeded, args, vocab)
+        print(f"seeded {args.applications} applications in {time.perf_counter() - started:.1f}s")
+
+        before_path = os.path.join(folder, "before.db")
+        after_path = os.path.join(folder, "after.db")
+        shutil.copy(seeded, before_path)
+        shutil.copy(seeded, after_path)
+
+        before_app = make_app(before_path, {})
+        with before_app.app_context(), db.engine.begin() as conn:
+            for name in LISTING_INDEXES:
+                conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+        before = measure(before_app, args)
+
+        started = time.perf_counter()
+        after_app = make_app(after_path, TUNED_PRAGMAS)
+        print(f"index build on startup: {time.perf_counter() - started:.1f}s")
+        after = measure(after_app, args)
+
+    print(f"{'route':<26} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for label in before:
+        print(f"{label:<26} {before[label]:>10.2f} {after[label]:>10.2f} "
+              f"{before[label] / max(after[label], 1e-6):>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Load time and throughput of each NLP mode, and a check that rankings match.
+
+    python benchmarks/bench_nlp_modes.py --resumes 200 --pages 2
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis import NLP_MODES, load_nlp, detect_skills, detect_skills_batch  # noqa: E402
+from benchmarks.bench_skill_matcher import load_vocab  # noqa: E402
+from benchmarks.corpus import resume_text  # noqa: E402
+from skills import SkillMatcher  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--n-process", type=int, default=1)
+    args = parser.parse_args()
+
+    matcher = SkillMatcher(load_vocab())
+    texts = [resume_text(args.pages, matcher.terms, seed=i) for i in range(args.resumes)]
+
+    reference = None
+    print(f"{'mode':>6} {'load s':>7} {'single/s':>9} {'batched/s':>10} {'identical':>9}")
+    for mode in NLP_MODES:
+        start = time.perf_counter()
+        nlp = load_nlp(mode)
+        load_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        single = [detect_skills(t, matcher, nlp) for t in texts]
+        single_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batched = detect_skills_batch(
+            texts, matcher, nlp, batch_size=args.batch_size, n_process=args.n_process
+        )
+        batched_s = time.perf_counter() - start
+
+        if reference is None:
+            reference = single
+        identical = single == batched == reference
+        print(
+            f"{mode:>6} {load_s:>7.2f} {len(texts) / single_s:>9.1f} "
+            f"{len(texts) / batched_s:>10.1f} {str(identical):>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Wall time and peak memory of PDF text extraction on large documents.
+
+Each measurement runs in a fresh process. Peak RSS includes the interpreter
+and imports; the traced column is the peak Python allocation made by the
+extraction itself. "legacy" is the previous implementation (whole document,
+``text += page``), "streamed" is analysis.extract_text_from_pdf with the
+app's default budgets.
+
+    python benchmarks/bench_pdf_extraction.py --pages 100 300 600
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PyPDF2  # noqa: E402
+
+from analysis import extract_text_from_pdf  # noqa: E402
+from benchmarks.corpus import resume_text, write_pdf  # noqa: E402
+from config import Config  # noqa: E402
+
+VOCAB = ["python", "docker", "kubernetes", "terraform", "kafka", "react", "aws"]
+
+
+def legacy_extract(path):
+    text = ""
+    with open(path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        for page in reader.pages:
+            text += page.extract_text() or ""
+    return text
+
+
+def streamed_extract(path):
+    return extract_text_from_pdf(
+        path,
+        max_chars=Config.EXTRACT_MAX_CHARS,
+        max_pages=Config.EXTRACT_MAX_PAGES,
+        time_limit_seconds=Config.EXTRACT_TIME_LIMIT_SECONDS,
+    )
+
+
+def measure(name, path, queue):
+    fn = legacy_extract if name == "legacy" else streamed_extract
+    tracemalloc.start()
+    start = time.perf_counter()
+    text = fn(path)
+    elapsed = time.perf_counter() - start
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed, rss_kb * 1024, traced_peak, len(text)))
+
+
+def run_isolated(name, path):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    proc = context.Process(target=measure, args=(name, path, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 300, 600])
+    args = parser.parse_args()
+
+    print(f"budgets: {Config.EXTRACT_MAX_CHARS} chars, {Config.EXTRACT_MAX_PAGES} pages, "
+          f"{Config.EXTRACT_TIME_LIMIT_SECONDS}s")
+    print(f"{'pages':>5} {'impl':>9} {'seconds':>8} {'peak RSS MB':>12} {'traced MB':>10} {'chars':>9}")
+    with tempfile.TemporaryDirectory() as folder:
+        for pages in args.pages:
+            path = os.path.join(folder, f"resume_{pages}.pdf")
+            write_pdf(path, resume_text(pages, VOCAB))
+            real_pages = len(PyPDF2.PdfReader(path).pages)
+            for name in ("legacy", "streamed"):
+                elapsed, rss, traced, chars = run_isolated(name, path)
+                print(f"{real_pages:>5} {name:>9} {elapsed:>8.2f} {rss / 2**20:>12.1f} "
+                      f"{traced / 2**20:>10.1f} {chars:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""End-to-end route benchmarks through the real app and Flask's test client.
+
+Generates a synthetic corpus (see corpus.py), then drives:
+
+  upload           candidate POST /upload, one resume per request
+  apply_job        candidate POST /apply_job against one job
+  view_candidates  HR GET /hr/job/<id>/candidates for that job, each sort
+  revalidate       the same GET with the ETag of the last response (304)
+  hr_bulk          HR POST /hr bulk form, --bulk-files per request, then
+                   waits for the background queue to analyse every file
+
+Each scenario reports requests/s (files/s for uploads), p50/p95 latency and
+the Python heap peak of one extra traced request (tracemalloc is off while
+timing). Pool worker processes are not included in the memory figure.
+
+The report is JSON so runs on different commits can be diffed:
+
+    python benchmarks/bench_routes.py --output before.json
+    git checkout <other commit>
+    python benchmarks/bench_routes.py --compare before.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ANALYSIS_QUEUE_WORKERS", "1")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from benchmarks.corpus import write_corpus, job_description  # noqa: E402
+from config import Config  # noqa: E402
+from models import db, User, JobPost, AnalysisTask  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def logged_in_client(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+        session["_fresh"] = True
+    return client
+
+
+def upload_part(path):
+    with open(path, "rb") as f:
+        return io.BytesIO(f.read()), os.path.basename(path)
+
+
+def wait_for_queue(app, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with app.app_context():
+            busy = AnalysisTask.query.filter(AnalysisTask.status.in_(("queued", "running"))).count()
+        if not busy:
+            return
+        time.sleep(0.02)
+    raise TimeoutError(f"analysis queue still busy after {timeout}s")
+
+
+def measure(request, count, warmup, files_per_request=None):
+    """Time ``request(i)`` for i in range(count); then trace one more call."""
+    for i in range(warmup):
+        request(count + 1 + i)
+    latencies = []
+    start = time.perf_counter()
+    for i in range(count):
+        began = time.perf_counter()
+        request(i)
+        latencies.append(time.perf_counter() - began)
+    wall = time.perf_counter() - start
+
+    tracemalloc.start()
+    request(count)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    ms = np.array(latencies) * 1000
+    result = {
+        "requests": count,
+        "seconds": round(wall, 4),
+        "requests_per_s": round(count / wall, 2),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "peak_mb": round(peak / 1e6, 2),
+    }
+    if files_per_request:
+        result["files_per_s"] = round(count * files_per_request / wall, 2)
+    return result
+
+
+def expect(response, status):
+    assert response.status_code == status, (response.status_code, response.get_data(as_text=True)[:500])
+
+
+def compare(report, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"vs {baseline_path} ({baseline['meta'].get('commit')}):", file=sys.stderr)
+    for name, now in report["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if not before:
+            continue
+        changes = "  ".join(
+            f"{key} {(now[key] - before[key]) / before[key] * 100:+.0f}%"
+            for key in ("requests_per_s", "p50_ms", "p95_ms", "peak_mb") if before.get(key) and key in now
+        )
+        print(f"  {name:<16} {changes}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20, help="timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--bulk-requests", type=int, default=3)
+    parser.add_argument("--bulk-files", type=int, default=20, help="files per bulk upload")
+    parser.add_argument("--pages", type=int, default=2, help="pages per resume")
+    parser.add_argument("--skill-density", type=float, default=0.03)
+    parser.add_argument("--job-skills", type=int, default=8)
+    parser.add_argument("--queue-timeout", type=float, default=600)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="earlier JSON report to print relative changes against")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        Config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(folder, "bench.db")
+        Config.UPLOAD_FOLDER = os.path.join(folder, "uploads")
+        from app import create_app
+        app = create_app()
+        app.config["WTF_CSRF_ENABLED"] = False
+        vocab = app.extensions["skill_taxonomy"].matcher().terms
+
+        per_scenario = args.requests + 1 + args.warmup
+        corpus = os.path.join(folder, "corpus")
+        os.makedirs(corpus)
+        uploads = write_corpus(corpus, per_scenario, args.pages, vocab, args.skill_density, seed=args.seed)
+        applications = write_corpus(corpus, per_scenario, args.pages, vocab, args.skill_density,
+                                    seed=args.seed + per_scenario)
+        bulk_count = (args.bulk_requests + 1) * args.bulk_files
+        bulk = write_corpus(corpus, bulk_count, args.pages, vocab, args.skill_density,
+                            seed=args.seed + 2 * per_scenario)
+        description, _ = job_description(vocab, args.job_skills, seed=args.seed)
+
+        with app.app_context():
+            for user_id, role in ((1, "hr"), (2, "candidate")):
+                user = User(id=user_id, username=f"{role}{user_id}", email=f"{role}{user_id}@example.com", role=role)
+                user.set_password("benchmark")
+                db.session.add(user)
+            db.session.commit()
+        hr, candidate = logged_in_client(app, 1), logged_in_client(app, 2)
+        expect(hr.post("/hr", data={"title": "Benchmark engineer", "description": description}), 302)
+        with app.app_context():
+            job_id = JobPost.query.filter_by(hr_id=1).one().job_id
+
+        scenarios = {}
+
+        def upload(i):
+            expect(candidate.post("/upload", data={"file": upload_part(uploads[i])}), 302)
+        scenarios["upload"] = measure(upload, args.requests, args.warmup, files_per_request=1)
+
+        def apply(i):
+            expect(candidate.post("/apply_job", data={"job_id": job_id, "file": upload_part(applications[i])}), 302)
+        scenarios["apply_job"] = measure(apply, args.requests, args.warmup, files_per_request=1)
+
+        sorts = ("date", "score", "match")
+
+        def view(i):
+            expect(hr.get(f"/hr/job/{job_id}/candidates?sort={sorts[i % len(sorts)]}"), 200)
+        scenarios["view_candidates"] = measure(view, args.requests, args.warmup)
+
+        etag = hr.get(f"/hr/job/{job_id}/candidates").headers.get("ETag")
+
+        def revalidate(i):
+            expect(hr.get(f"/hr/job/{job_id}/candidates", headers={"If-None-Match": etag or ""}),
+                   304 if etag else 200)
+        scenarios["revalidate"] = measure(revalidate, args.requests, args.warmup)
+
+        # bulk requests return once files are stored and queued; the
+        # scenario time also covers the queue working through them
+        def bulk_upload(i):
+            chunk = bulk[i * args.bulk_files:(i + 1) * args.bulk_files]
+            expect(hr.post("/hr", data={"description": description, "target_job_id": job_id,
+                                        "file": [upload_part(p) for p in chunk]}), 302)
+            wait_for_queue(app, args.queue_timeout)
+        scenarios["hr_bulk"] = measure(bulk_upload, args.bulk_requests, 0, files_per_request=args.bulk_files)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "nlp_mode": Config.NLP_MODE,
+            "analysis_workers": Config.ANALYSIS_WORKERS,
+            "args": vars(args),
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+        "scenarios": scenarios,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    for name, row in scenarios.items():
+        print(f"{name:<16} {row['requests_per_s']:>8.1f} req/s  p50 {row['p50_ms']:>8.1f} ms  "
+              f"p95 {row['p95_ms']:>8.1f} ms  peak {row['peak_mb']:>7.1f} MB", file=sys.stderr)
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
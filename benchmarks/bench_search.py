@@ -0,0 +1,124 @@
+"""Latency of the HR full-text search (search.search_page) over a large corpus.
+
+Stores --documents synthetic resumes as applications to --jobs jobs through
+store_texts(), which also feeds the FTS5 index, then times each query for the
+first page and a deeper one. With --like the same word queries also run as
+the LIKE '%term%' scan over an inline text column that a search without the
+index would need.
+
+    python benchmarks/bench_search.py --documents 100000 --like
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ANALYSIS_QUEUE_WORKERS", "0")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from benchmarks.corpus import resume_text  # noqa: E402
+from benchmarks.bench_skill_matcher import load_vocab  # noqa: E402
+from config import Config  # noqa: E402
+from models import db, User, JobPost, JobApplication, PREVIEW_CHARS, store_texts  # noqa: E402
+from search import search_page  # noqa: E402
+
+QUERIES = [
+    ("one skill", "kubernetes"),
+    ("two skills", "python docker"),
+    ("phrase", '"machine learning"'),
+    ("prefix", "micro*"),
+    ("rare", "haskell erlang"),
+]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.95))], result
+
+
+def like_scan(conn, query):
+    # ranking needs every match, so the scan cannot stop at one page
+    words = query.replace('"', " ").split()
+    sql = "SELECT count(*) FROM inline_text WHERE " + " AND ".join("body LIKE ?" for _ in words)
+    return conn.execute(sql, [f"%{w.rstrip('*')}%" for w in words]).fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100000)
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=1, help="pages per resume")
+    parser.add_argument("--limit", type=int, default=20, help="results per page")
+    parser.add_argument("--deep-page", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=2000)
+    parser.add_argument("--like", action="store_true", help="also time a LIKE scan without the index")
+    args = parser.parse_args()
+
+    vocab = list(load_vocab())
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "search.db")
+        Config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + path
+        from app import create_app
+        app = create_app()
+        with app.app_context():
+            db.session.add(User(id=1, username="hr", email="hr@example.com", password_hash="-", role="hr"))
+            db.session.add(User(id=2, username="candidate", email="c@example.com", password_hash="-",
+                                role="candidate"))
+            db.session.execute(db.insert(JobPost), [
+                dict(id=j, job_id=f"JOB-{j}", title="Bench", description="-", hr_id=1)
+                for j in range(1, args.jobs + 1)
+            ])
+            db.session.commit()
+
+            started = time.perf_counter()
+            for first in range(0, args.documents, args.batch):
+                texts = [resume_text(args.pages, vocab, seed=i)
+                         for i in range(first, min(first + args.batch, args.documents))]
+                text_ids = store_texts(texts)
+                db.session.execute(db.insert(JobApplication), [
+                    dict(job_id=(first + i) % args.jobs + 1, candidate_id=2, text_id=text_id,
+                         preview=text[:PREVIEW_CHARS], score=0, filename=f"{first + i}.pdf")
+                    for i, (text, text_id) in enumerate(zip(texts, text_ids))
+                ])
+                db.session.commit()
+            build_s = time.perf_counter() - started
+            print(f"{args.documents} documents stored and indexed in {build_s:.1f}s "
+                  f"({args.documents / build_s:.0f}/s), db {os.path.getsize(path) / 1e6:.0f} MB")
+
+            print(f"{'query':<12} {'hits p1':>7} {'p1 p50':>8} {'p1 p95':>8} "
+                  f"{'p' + str(args.deep_page) + ' p50':>8} {'one job':>8}")
+            for label, query in QUERIES:
+                p50, p95, (rows, _) = timed(lambda: search_page(query, 1, limit=args.limit), args.repeat)
+                deep, _, _ = timed(lambda: search_page(query, 1, page=args.deep_page, limit=args.limit),
+                                   args.repeat)
+                job, _, _ = timed(lambda: search_page(query, 1, job_code="JOB-1", limit=args.limit), args.repeat)
+                print(f"{label:<12} {len(rows):>7} {p50:>8.2f} {p95:>8.2f} {deep:>8.2f} {job:>8.2f}")
+
+        if args.like:
+            conn = sqlite3.connect(os.path.join(folder, "inline.db"))
+            conn.execute("CREATE TABLE inline_text (id INTEGER PRIMARY KEY, body TEXT)")
+            for first in range(0, args.documents, args.batch):
+                conn.executemany("INSERT INTO inline_text (body) VALUES (?)", [
+                    (resume_text(args.pages, vocab, seed=i),)
+                    for i in range(first, min(first + args.batch, args.documents))
+                ])
+            conn.commit()
+            print(f"{'LIKE scan':<12} {'matches':>7} {'p50 ms':>8}")
+            for label, query in QUERIES:
+                p50, _, matches = timed(lambda: like_scan(conn, query), max(3, args.repeat // 4))
+                print(f"{label:<12} {matches:>7} {p50:>8.2f}")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
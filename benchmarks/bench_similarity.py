@@ -0,0 +1,66 @@
+"""Re-ranking a job's applicants: one sparse matrix-vector product against a
+per-applicant loop over the same stored vectors.
+
+    python benchmarks/bench_similarity.py --applicants 100 1000 10000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_skill_matcher import load_vocab  # noqa: E402
+from benchmarks.corpus import resume_text  # noqa: E402
+from scoring import term_vector, pack, unpack, stack, cosine_scores  # noqa: E402
+from skills import SkillMatcher  # noqa: E402
+
+
+def row_by_row(blobs, query):
+    """Same IDF and cosine, one applicant at a time."""
+    vectors = [unpack(blob) for blob in blobs]
+    df = {}
+    for v in vectors + [query]:
+        for i in v.indices:
+            df[i] = df.get(i, 0) + 1
+    n = len(vectors) + 1
+    idf = {i: np.log((1 + n) / (1 + d)) + 1 for i, d in df.items()}
+    q = {i: w * idf[i] for i, w in zip(query.indices, query.data)}
+    q_norm = np.sqrt(sum(w * w for w in q.values()))
+    scores = []
+    for v in vectors:
+        row = {i: w * idf[i] for i, w in zip(v.indices, v.data)}
+        norm = np.sqrt(sum(w * w for w in row.values()))
+        dot = sum(w * q.get(i, 0.0) for i, w in row.items())
+        scores.append(dot / (norm * q_norm) if norm and q_norm else 0.0)
+    return np.array(scores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--applicants", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--pages", type=int, default=2)
+    args = parser.parse_args()
+
+    vocab = load_vocab()
+    matcher = SkillMatcher(vocab)
+    query = term_vector(resume_text(1, vocab, skill_density=0.1, seed=-1), matcher)
+    templates = [pack(term_vector(resume_text(args.pages, vocab, seed=i), matcher)) for i in range(200)]
+
+    print(f"{'applicants':>10} {'matrix ms':>10} {'loop ms':>10} {'speedup':>8}")
+    for count in args.applicants:
+        blobs = [templates[i % len(templates)] for i in range(count)]
+        start = time.perf_counter()
+        fast = cosine_scores(stack(blobs), query)
+        matrix = time.perf_counter() - start
+        start = time.perf_counter()
+        slow = row_by_row(blobs, query)
+        loop = time.perf_counter() - start
+        assert np.allclose(fast, slow, atol=1e-4)
+        print(f"{count:>10} {matrix * 1000:>10.1f} {loop * 1000:>10.1f} {loop / matrix:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
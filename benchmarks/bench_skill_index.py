@@ -0,0 +1,107 @@
+"""Top-K resume search with the in-process skill index against the same
+ranking done in SQL (GROUP BY over resume_skill).
+
+Seeds --resumes resumes with --skills skills each, then reports the index
+build time, an incremental refresh after 1% more resumes, and the median
+query time of both approaches.
+
+    python benchmarks/bench_skill_index.py --resumes 300000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ANALYSIS_QUEUE_WORKERS", "0")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from config import Config  # noqa: E402
+from models import db, User, Resume, ResumeSkill, Skill  # noqa: E402
+from skill_index import SkillIndex  # noqa: E402
+
+
+def seed(first_id, count, args, vocab_size, rng):
+    for offset in range(0, count, 10000):
+        ids = range(first_id + offset, first_id + min(offset + 10000, count))
+        db.session.execute(db.insert(Resume), [
+            dict(id=i, filename=f"{i}.pdf", user_id=2 + i % 1000) for i in ids
+        ])
+        db.session.execute(db.insert(ResumeSkill), [
+            dict(resume_id=i, skill_id=s, rank=r)
+            for i in ids
+            for r, s in enumerate(rng.sample(range(1, vocab_size + 1), args.skills))
+        ])
+    db.session.commit()
+
+
+def sql_top_k(names, k):
+    return (
+        db.session.query(ResumeSkill.resume_id, db.func.count().label("hits"))
+        .join(Skill, Skill.id == ResumeSkill.skill_id)
+        .filter(Skill.name.in_(names))
+        .group_by(ResumeSkill.resume_id)
+        .order_by(db.desc("hits"), ResumeSkill.resume_id.desc())
+        .limit(k)
+        .all()
+    )
+
+
+def median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, default=300000)
+    parser.add_argument("--skills", type=int, default=12, help="skills per resume")
+    parser.add_argument("--required", type=int, default=8, help="skills per job")
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from benchmarks.bench_skill_matcher import load_vocab
+    vocab = list(load_vocab())
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as folder:
+        Config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(folder, "index.db")
+        from app import create_app
+        app = create_app()
+        with app.app_context():
+            db.session.execute(db.insert(User), [
+                dict(id=i, username=f"u{i}", email=f"u{i}@example.com", password_hash="-",
+                     role="hr" if i == 1 else "candidate")
+                for i in range(1, 1002)
+            ])
+            db.session.execute(db.insert(Skill), [dict(id=i + 1, name=s) for i, s in enumerate(vocab)])
+            seed(1, args.resumes, args, len(vocab), rng)
+
+            index = SkillIndex()
+            start = time.perf_counter()
+            index.refresh()
+            print(f"build: {args.resumes} resumes in {time.perf_counter() - start:.2f}s")
+
+            delta = max(1, args.resumes // 100)
+            seed(args.resumes + 1, delta, args, len(vocab), rng)
+            start = time.perf_counter()
+            index.refresh()
+            print(f"refresh: {delta} new resumes in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+            required = rng.sample(vocab, args.required)
+            assert [h for h, _ in index.top_k(required, args.k)] == [r for r, _ in sql_top_k(required, args.k)]
+            print(f"top-{args.k} of {args.required} skills:")
+            print(f"  skill index {median_ms(lambda: index.top_k(required, args.k, hr_id=1), args.repeat):8.2f} ms")
+            print(f"  SQL GROUP BY {median_ms(lambda: sql_top_k(required, args.k), args.repeat):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Compare the compiled SkillMatcher with the old per-term substring loop.
+
+    python benchmarks/bench_skill_matcher.py --pages 1 5 10 25 50
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import resume_text  # noqa: E402
+from skills import SkillMatcher, default_matcher  # noqa: E402
+
+
+def load_vocab():
+    return default_matcher().terms
+
+
+def substring_loop(vocab, text):
+    lower = text.lower()
+    return {s for s in vocab if s in lower}
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 5, 10, 25, 50])
+    parser.add_argument("--resumes", type=int, default=20, help="resumes per page size")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    vocab = load_vocab()
+    start = time.perf_counter()
+    matcher = SkillMatcher(vocab)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"vocab={len(vocab)} terms, matcher build {build_ms:.1f} ms")
+    print(f"{'pages':>5} {'chars':>9} {'loop ms':>9} {'matcher ms':>11} {'speedup':>8} {'false hits':>10}")
+
+    for pages in args.pages:
+        texts = [resume_text(pages, vocab, seed=i) for i in range(args.resumes)]
+        chars = sum(len(t) for t in texts) // len(texts)
+        loop_s = best_of(lambda: [substring_loop(vocab, t) for t in texts], args.repeat)
+        match_s = best_of(lambda: [matcher.find(t) for t in texts], args.repeat)
+        # terms the substring loop reports that are not word-bounded hits
+        false_hits = sum(
+            len(substring_loop(vocab, t) - set(matcher.find(t))) for t in texts
+        ) / len(texts)
+        print(
+            f"{pages:>5} {chars:>9} {loop_s / len(texts) * 1000:>9.2f} "
+            f"{match_s / len(texts) * 1000:>11.2f} {loop_s / match_s:>7.1f}x {false_hits:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
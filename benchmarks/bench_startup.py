@@ -0,0 +1,81 @@
+"""Cold start cost of the app, each sample in a fresh interpreter.
+
+Reports the median of --repeat runs for: importing app, create_app() on a
+new database and on one whose schema is already current, the first /login
+request, and the first request that needs NLP (where the lazily loaded
+spaCy pipeline is paid). With --preload the pipeline loads in create_app
+instead, as it would in a gunicorn --preload master.
+
+    python benchmarks/bench_startup.py --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import json, os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, ROOT)
+import app as app_module
+imported = time.perf_counter()
+app = app_module.create_app()
+created = time.perf_counter()
+app.config["WTF_CSRF_ENABLED"] = False
+client = app.test_client()
+assert client.get("/login").status_code == 200
+login = time.perf_counter()
+# creating a job parses its description, the first NLP use
+from models import db, User
+with app.app_context():
+    if not User.query.get(1):
+        db.session.add(User(id=1, username="hr", email="hr@example.com", password_hash="-", role="hr"))
+        db.session.commit()
+with client.session_transaction() as session:
+    session["_user_id"] = "1"
+assert client.post("/hr", data={"title": "Startup", "description": "python and docker engineer"}).status_code == 302
+nlp = time.perf_counter()
+print(json.dumps({
+    "import_app": imported - start, "create_app": created - imported,
+    "first_login": login - created, "first_nlp_request": nlp - login,
+}))
+""".replace("ROOT", repr(ROOT))
+
+
+def probe(database, preload):
+    env = dict(os.environ, DATABASE_URL="sqlite:///" + database, ANALYSIS_QUEUE_WORKERS="0",
+               PRELOAD_NLP="1" if preload else "0")
+    out = subprocess.run([sys.executable, "-c", PROBE], env=env, cwd=ROOT,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--preload", action="store_true", help="also measure PRELOAD_NLP=1")
+    args = parser.parse_args()
+
+    modes = [("lazy", False)] + ([("preload", True)] if args.preload else [])
+    with tempfile.TemporaryDirectory() as folder:
+        for label, preload in modes:
+            samples = {"new database": [], "existing database": []}
+            for i in range(args.repeat):
+                database = os.path.join(folder, f"{label}-{i}.db")
+                samples["new database"].append(probe(database, preload))
+                samples["existing database"].append(probe(database, preload))
+            print(f"{label} ({args.repeat} runs, median seconds)")
+            print(f"  {'':<18} {'import app':>10} {'create_app':>10} {'1st /login':>10} {'1st NLP':>10}")
+            for name, runs in samples.items():
+                cols = [statistics.median(r[key] for r in runs)
+                        for key in ("import_app", "create_app", "first_login", "first_nlp_request")]
+                print(f"  {name:<18}" + "".join(f" {c:>10.3f}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
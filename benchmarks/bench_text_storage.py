@@ -0,0 +1,107 @@
+"""Database size and listing row fetch with resume text inline on every row
+versus stored once per distinct text in document_text.
+
+Each of --resumes candidates applies to --applies jobs with the same resume,
+so the inline layout holds that many copies of each text. "fetch" reads
+whole application rows for one job, the way a model query does.
+
+    python benchmarks/bench_text_storage.py --resumes 5000 --applies 4
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ANALYSIS_QUEUE_WORKERS", "0")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from benchmarks.corpus import resume_text  # noqa: E402
+from benchmarks.bench_skill_matcher import load_vocab  # noqa: E402
+from config import Config  # noqa: E402
+from models import db, User, JobPost, JobApplication, PREVIEW_CHARS, store_texts  # noqa: E402
+
+INLINE_SCHEMA = """
+CREATE TABLE job_application (
+    id INTEGER PRIMARY KEY, job_id INTEGER, candidate_id INTEGER NOT NULL, resume_text TEXT,
+    score INTEGER, shortlisted BOOLEAN, created_at DATETIME, filename VARCHAR(255)
+);
+CREATE INDEX ix_job_application_job_created ON job_application (job_id, created_at);
+"""
+
+
+def applications(args, rng):
+    for i in range(args.resumes):
+        for job in rng.sample(range(1, args.jobs + 1), args.applies):
+            yield i, job, rng.randint(0, 100)
+
+
+def median_ms(fn, repeat=20):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, default=5000)
+    parser.add_argument("--applies", type=int, default=4, help="jobs each resume is sent to")
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=2)
+    args = parser.parse_args()
+
+    vocab = list(load_vocab())
+    texts = [resume_text(args.pages, vocab, seed=i)[:10000] for i in range(args.resumes)]
+    rows = list(applications(args, random.Random(0)))
+    fetch = "SELECT * FROM job_application WHERE job_id = 1 ORDER BY created_at DESC LIMIT 500"
+
+    with tempfile.TemporaryDirectory() as folder:
+        inline_path = os.path.join(folder, "inline.db")
+        conn = sqlite3.connect(inline_path)
+        conn.executescript(INLINE_SCHEMA)
+        conn.executemany(
+            "INSERT INTO job_application (job_id, candidate_id, resume_text, score, shortlisted, created_at, filename)"
+            " VALUES (?, ?, ?, ?, 0, datetime('now'), ?)",
+            [(job, i + 2, texts[i], score, f"{i}.pdf") for i, job, score in rows],
+        )
+        conn.commit()
+        inline_ms = median_ms(lambda: conn.execute(fetch).fetchall())
+        conn.close()
+
+        shared_path = os.path.join(folder, "shared.db")
+        Config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + shared_path
+        from app import create_app
+        app = create_app()
+        with app.app_context():
+            db.session.add(User(id=1, username="hr", email="hr@example.com", password_hash="-", role="hr"))
+            db.session.execute(db.insert(JobPost), [
+                dict(id=j, job_id=f"JOB-{j}", title="Bench", description="-", hr_id=1)
+                for j in range(1, args.jobs + 1)
+            ])
+            text_ids = store_texts(texts)
+            db.session.execute(db.insert(JobApplication), [
+                dict(job_id=job, candidate_id=i + 2, text_id=text_ids[i], preview=texts[i][:PREVIEW_CHARS],
+                     score=score, filename=f"{i}.pdf")
+                for i, job, score in rows
+            ])
+            db.session.commit()
+            db.session.execute(db.text("VACUUM"))
+            shared_ms = median_ms(lambda: db.session.execute(db.text(fetch)).fetchall())
+        with sqlite3.connect(shared_path) as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        print(f"{len(rows)} applications from {args.resumes} resumes ({args.applies} jobs each)")
+        print(f"{'layout':<14} {'db MB':>8} {'fetch ms':>9}")
+        print(f"{'inline':<14} {os.path.getsize(inline_path) / 1e6:>8.1f} {inline_ms:>9.2f}")
+        print(f"{'document_text':<14} {os.path.getsize(shared_path) / 1e6:>8.1f} {shared_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Peak Python memory while the app handles one bulk upload request.
+
+The multipart body is built before measuring starts, so the numbers cover
+only form parsing, streaming each part to disk and queueing. With parts
+spooled and copied in 64 KB chunks, the peak should not grow with the
+number of files.
+
+    python benchmarks/bench_upload_memory.py --files 10 50 100 --size-kb 512
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ANALYSIS_QUEUE_WORKERS", "0")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from werkzeug.test import EnvironBuilder  # noqa: E402
+
+from config import Config  # noqa: E402
+from models import db, User, JobPost  # noqa: E402
+
+
+def fake_pdf(size, seed):
+    return b"%PDF-1.4\n%" + str(seed).encode() + b"\n" + os.urandom(size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--size-kb", type=int, default=512)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        Config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(folder, "upload.db")
+        Config.UPLOAD_FOLDER = os.path.join(folder, "uploads")
+        Config.MAX_CONTENT_LENGTH = None
+        from app import create_app
+        app = create_app()
+        app.config["WTF_CSRF_ENABLED"] = False
+        with app.app_context():
+            db.session.add(User(id=1, username="hr", email="hr@example.com", password_hash="-", role="hr"))
+            db.session.add(JobPost(job_id="JOB-1", title="Bench", description="python docker", hr_id=1))
+            db.session.commit()
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session["_user_id"] = "1"
+            session["_fresh"] = True
+
+        print(f"{'files':>6} {'body MB':>8} {'peak MB':>8}")
+        for count in args.files:
+            files = [(io.BytesIO(fake_pdf(args.size_kb * 1024, i)), f"r{i}.pdf") for i in range(count)]
+            builder = EnvironBuilder(path="/hr", method="POST", data={
+                "description": "python docker", "target_job_id": "JOB-1", "file": files,
+            })
+            environ = builder.get_environ()
+            body = int(environ["CONTENT_LENGTH"]) / 1e6
+
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            response = client.open(environ)
+            peak = tracemalloc.get_traced_memory()[1] - before
+            tracemalloc.stop()
+            assert response.status_code == 302, response.status_code
+            print(f"{count:>6} {body:>8.1f} {peak / 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Synthetic resumes and job descriptions used by the benchmark scripts."""
+import os
+import random
+
+WORDS_PER_PAGE = 450
+
+FILLER = (
+    "responsible for designing building and maintaining services across teams "
+    "delivered projects on time worked closely with stakeholders improved "
+    "reliability reduced costs led initiatives mentored engineers owned the "
+    "roadmap for internal tooling collaborated with product and design to ship "
+    "features used by customers wrote documentation reviewed code and handled "
+    "on call rotations for critical systems experience summary education "
+    "bachelor degree university projects achievements certifications"
+).split()
+
+
+def resume_text(pages, vocab, skill_density=0.03, seed=0):
+    """Return resume-like text of roughly ``pages`` pages.
+
+    ``skill_density`` is the fraction of words replaced by a vocab term.
+    """
+    rng = random.Random(seed)
+    vocab = list(vocab)
+    lines = []
+    line = []
+    for _ in range(pages * WORDS_PER_PAGE):
+        if rng.random() < skill_density:
+            line.append(rng.choice(vocab))
+        else:
+            line.append(rng.choice(FILLER))
+        if len(line) >= 12:
+            lines.append(" ".join(line).capitalize() + ".")
+            line = []
+    if line:
+        lines.append(" ".join(line))
+    return "\n".join(lines)
+
+
+LINES_PER_PDF_PAGE = 45
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, text):
+    """Write ``text`` as a minimal PDF (Helvetica, one text object per page)."""
+    lines = [line.encode("latin-1", "replace").decode("latin-1") for line in text.splitlines()]
+    pages = [lines[i:i + LINES_PER_PDF_PAGE] for i in range(0, len(lines), LINES_PER_PDF_PAGE)] or [[]]
+
+    objects = []  # object bodies; object number = index + 1
+    objects.append("<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(None)  # page tree, filled in below
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    kids = []
+    for page_lines in pages:
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 800 Td"]
+        for line in page_lines:
+            ops.append(f"({_pdf_escape(line)}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops)
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+        content_ref = len(objects)
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_ref} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def write_docx(path, text):
+    from docx import Document
+
+    doc = Document()
+    for line in text.splitlines():
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+def write_resume(path, pages, vocab, skill_density=0.03, seed=0):
+    text = resume_text(pages, vocab, skill_density=skill_density, seed=seed)
+    if path.endswith(".pdf"):
+        write_pdf(path, text)
+    else:
+        write_docx(path, text)
+    return text
+
+
+def write_corpus(folder, count, pages, vocab, skill_density=0.03, kinds=("pdf", "docx"), seed=0):
+    """Write ``count`` distinct resumes to ``folder``, cycling through ``kinds``.
+
+    Every file gets its own seed, so no two share content (and a content
+    cache cannot turn the run into repeats).
+    """
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f"resume_{seed + i}.{kinds[i % len(kinds)]}")
+        write_resume(path, pages, vocab, skill_density=skill_density, seed=seed + i)
+        paths.append(path)
+    return paths
+
+
+def job_description(vocab, skills=8, seed=0):
+    """(description text, the ``skills`` vocab terms it asks for)."""
+    rng = random.Random(seed)
+    required = rng.sample(list(vocab), skills)
+    filler = " ".join(rng.choice(FILLER) for _ in range(60))
+    text = (
+        f"We are hiring an engineer to join a growing team. {filler.capitalize()}.\n"
+        f"Required experience: {', '.join(required)}."
+    )
+    return text, required
@@ -11,10 +11,99 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(BASE_DIR, 'instance', 'resumes.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Applied on every new SQLite connection: WAL lets page reads run while the
+    # queue workers write, NORMAL sync is safe under WAL, and the cache/mmap
+    # sizes keep the hot listing indexes in memory
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'cache_size': -int(os.environ.get('SQLITE_CACHE_KB', 64000)),  # negative = KiB
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    }
 
     # File upload settings
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
     ALLOWED_EXTENSIONS = {'pdf', 'docx'}
+    # whole request (Flask answers 413 above this), each file, and the size up
+    # to which a file is also kept in memory and parsed without a disk read
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_UPLOAD_REQUEST_MB', 200)) * 1024 * 1024
+    MAX_UPLOAD_FILE_BYTES = int(os.environ.get('MAX_UPLOAD_FILE_MB', 10)) * 1024 * 1024
+    UPLOAD_MEMORY_BYTES = int(os.environ.get('UPLOAD_MEMORY_KB', 1024)) * 1024
+
+    # NLP pipeline: "fast" loads en_core_web_sm without the components skill
+    # detection never reads, "full" loads everything, "blank" skips the model
+    NLP_MODE = os.environ.get('NLP_MODE', 'fast')
+    NLP_BATCH_SIZE = int(os.environ.get('NLP_BATCH_SIZE', 16))
+    # The pipeline loads on first use; set PRELOAD_NLP=1 with gunicorn --preload
+    # to load it once in the master and share it copy-on-write with workers
+    PRELOAD_NLP = os.environ.get('PRELOAD_NLP', '0') == '1'
+
+    # Bulk analysis process pool (1 = analyse inline in the request process)
+    ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', os.cpu_count() or 1))
+    ANALYSIS_CHUNK_SIZE = int(os.environ.get('ANALYSIS_CHUNK_SIZE', 4))
+    ANALYSIS_START_METHOD = os.environ.get('ANALYSIS_START_METHOD', 'spawn')
+
+    # TF-IDF similarity: extra weight of vocabulary skill hits over plain words
+    SKILL_FEATURE_WEIGHT = float(os.environ.get('SKILL_FEATURE_WEIGHT', 3.0))
+
+    # Skill taxonomy (skills grouped by category, plus aliases per skill); the
+    # file is checked for changes at most this often and reloaded in place
+    SKILLS_TAXONOMY_PATH = os.environ.get('SKILLS_TAXONOMY_PATH', os.path.join(BASE_DIR, 'data', 'skills.json'))
+    SKILLS_TAXONOMY_CHECK_SECONDS = float(os.environ.get('SKILLS_TAXONOMY_CHECK_SECONDS', 5))
+
+    # Rows per page on the HR listing pages
+    PAGE_SIZE = int(os.environ.get('PAGE_SIZE', 50))
+    # Applicant exports read this many rows at a time (Parquet: one row group each)
+    EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 1000))
+
+    # Text extraction budgets per document: stop after this many characters
+    # or pages, and give up on a document that takes longer than the limit
+    EXTRACT_MAX_CHARS = int(os.environ.get('EXTRACT_MAX_CHARS', 100000))
+    EXTRACT_MAX_PAGES = int(os.environ.get('EXTRACT_MAX_PAGES', 50))
+    EXTRACT_TIME_LIMIT_SECONDS = float(os.environ.get('EXTRACT_TIME_LIMIT_SECONDS', 20))
+    # processes that enforce that limit for files not sent to the analysis pool
+    # (0 = extract in the calling thread, which only checks it between pages)
+    EXTRACT_PROCESSES = int(os.environ.get('EXTRACT_PROCESSES', 2))
+
+    # Background queue for bulk uploads (0 workers = nothing is processed here)
+    ANALYSIS_QUEUE_WORKERS = int(os.environ.get('ANALYSIS_QUEUE_WORKERS', 1))
+    ANALYSIS_QUEUE_BATCH = int(os.environ.get('ANALYSIS_QUEUE_BATCH', 16))
+    ANALYSIS_QUEUE_POLL_SECONDS = float(os.environ.get('ANALYSIS_QUEUE_POLL_SECONDS', 2))
+    ANALYSIS_TASK_STALE_SECONDS = int(os.environ.get('ANALYSIS_TASK_STALE_SECONDS', 600))
+    ANALYSIS_TASK_MAX_ATTEMPTS = int(os.environ.get('ANALYSIS_TASK_MAX_ATTEMPTS', 3))
+    # applications per background re-score task after a job description edit
+    RESCORE_CHUNK_SIZE = int(os.environ.get('RESCORE_CHUNK_SIZE', 500))
+
+    # Background clean-up (reclaim.py): deleted jobs are removed this many rows
+    # per transaction, pausing between chunks so other writers get the lock;
+    # TEMP bulk-upload jobs expire after the retention period (0 = never), and
+    # unreferenced uploads and texts older than the grace period are removed
+    RECLAIM_INTERVAL_SECONDS = float(os.environ.get('RECLAIM_INTERVAL_SECONDS', 900))
+    RECLAIM_CHUNK_SIZE = int(os.environ.get('RECLAIM_CHUNK_SIZE', 500))
+    RECLAIM_PAUSE_SECONDS = float(os.environ.get('RECLAIM_PAUSE_SECONDS', 0.05))
+    RECLAIM_GRACE_SECONDS = int(os.environ.get('RECLAIM_GRACE_SECONDS', 3600))
+    TEMP_JOB_RETENTION_DAYS = float(os.environ.get('TEMP_JOB_RETENTION_DAYS', 30))
+
+    # Analysis caches
+    JOB_PROFILE_CACHE_SIZE = int(os.environ.get('JOB_PROFILE_CACHE_SIZE', 1024))
+    # extracted text + skills per unique upload: LRU entries held in memory,
+    # and rows kept in the database before the least recently used are cleared
+    EXTRACTION_CACHE_SIZE = int(os.environ.get('EXTRACTION_CACHE_SIZE', 512))
+    EXTRACTION_CACHE_MAX_ROWS = int(os.environ.get('EXTRACTION_CACHE_MAX_ROWS', 50000))
+    # rendered-page data for the HR dashboard, bulk results and candidate
+    # lists, per user and page revision
+    PAGE_CACHE_SIZE = int(os.environ.get('PAGE_CACHE_SIZE', 256))
+
+    # /metrics (Prometheus text format); when a token is set, scrapers must
+    # send it as "Authorization: Bearer <token>"
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+    # Opt-in request profiling: cProfile a sample of requests and dump a .prof
+    # file for each one slower than PROFILE_MIN_MS
+    PROFILE_REQUESTS = os.environ.get('PROFILE_REQUESTS', '0') == '1'
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0.1))
+    PROFILE_MIN_MS = int(os.environ.get('PROFILE_MIN_MS', 200))
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(BASE_DIR, 'instance', 'profiles'))
 
     # ✅ Flask-Mail Configuration (for Gmail)
     MAIL_SERVER = 'smtp.gmail.com'
@@ -0,0 +1,105 @@
+"""Applicant exports for one job, as streamed CSV or chunked Parquet.
+
+Rows come from a single query read through a server-side cursor in chunks
+of ``chunk_size`` (yield_per), with one extra query per chunk for the
+skills, so memory stays flat however many applications the job has.
+Parquet needs pyarrow (in requirements.txt); it is imported only when a
+Parquet export is asked for, so CSV keeps working without it.
+"""
+import csv
+import io
+
+from listings import skills_for_applications
+from models import db, User, JobApplication
+
+COLUMNS = ("application_id", "job_id", "candidate", "email", "filename", "score",
+           "similarity", "shortlisted", "created_at", "skills")
+FORMATS = ("csv", "parquet")
+
+
+class ExportUnavailable(Exception):
+    """The requested format needs a package that is not installed."""
+
+
+def export_chunks(job, min_score=None, shortlisted=None, chunk_size=1000):
+    """Yield lists of row dicts (keys in COLUMNS) for ``job``, oldest first."""
+    stmt = (
+        db.select(JobApplication.id, JobApplication.filename, JobApplication.original_filename, JobApplication.score, JobApplication.similarity,
+                  JobApplication.shortlisted, JobApplication.created_at, User.username, User.email)
+        .outerjoin(User, User.id == JobApplication.candidate_id)
+        .where(JobApplication.job_id == job.id)
+        .order_by(JobApplication.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    if min_score is not None:
+        stmt = stmt.where(JobApplication.score >= min_score)
+    if shortlisted is not None:
+        stmt = stmt.where(JobApplication.shortlisted == shortlisted)
+    for rows in db.session.execute(stmt).partitions():
+        skills = skills_for_applications([r.id for r in rows])
+        yield [
+            {
+                "application_id": r.id,
+                "job_id": job.job_id,
+                "candidate": r.username,
+                "email": r.email,
+                "filename": r.original_filename or r.filename,
+                "score": r.score,
+                "similarity": r.similarity,
+                "shortlisted": bool(r.shortlisted),
+                "created_at": r.created_at,
+                "skills": skills.get(r.id, []),
+            }
+            for r in rows
+        ]
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        value = ";".join(value)
+    elif hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + value  # keep spreadsheets from running it as a formula
+    return value
+
+
+def csv_stream(chunks):
+    """CSV text, header first, one piece per chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for rows in chunks:
+        for row in rows:
+            writer.writerow([_cell(row[c]) for c in COLUMNS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def write_parquet(chunks, fileobj):
+    """Write the chunks to ``fileobj`` as Parquet, one row group per chunk."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportUnavailable("Parquet export needs pyarrow installed") from None
+    schema = pa.schema([
+        ("application_id", pa.int64()),
+        ("job_id", pa.string()),
+        ("candidate", pa.string()),
+        ("email", pa.string()),
+        ("filename", pa.string()),
+        ("score", pa.float64()),
+        ("similarity", pa.float64()),
+        ("shortlisted", pa.bool_()),
+        ("created_at", pa.timestamp("us")),
+        ("skills", pa.list_(pa.string())),
+    ])
+    with pq.ParquetWriter(fileobj, schema) as writer:
+        for rows in chunks:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
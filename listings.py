@@ -0,0 +1,120 @@
+"""Paginated, column-projected application listings for the HR pages.
+
+Rows are fetched with one query (applications joined to their candidate and
+job, with only a 200-char slice of the resume text) plus one query for the
+skills of the rows on the page. Pages are addressed by a keyset cursor, so
+page N costs the same as page 1.
+"""
+import base64
+import json
+from datetime import datetime
+
+from models import db, User, JobPost, JobApplication, ApplicationSkill, Skill
+
+SORTS = ("date", "score", "match")
+
+
+def _sort_column(sort):
+    if sort == "score":
+        return JobApplication.score
+    if sort == "match":
+        # similarity is NULL until the job is first re-ranked
+        return db.func.coalesce(JobApplication.similarity, 0.0)
+    return JobApplication.created_at
+
+
+def encode_cursor(sort, value, row_id):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort):
+    """Return (value, id) from a cursor, or None if it is missing or invalid."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, row_id = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if cursor_sort != sort:
+        return None
+    if sort == "date" and value is not None:
+        value = datetime.fromisoformat(value)
+    return value, int(row_id)
+
+
+def application_page(filters, sort="date", cursor=None, limit=50):
+    """One page of applications matching ``filters``, newest or best first.
+
+    Returns ``(rows, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
+    sort = sort if sort in SORTS else "date"
+    column = _sort_column(sort)
+    q = (
+        db.session.query(
+            JobApplication.id,
+            JobApplication.filename,
+            JobApplication.original_filename,
+            JobApplication.score,
+            JobApplication.similarity,
+            JobApplication.shortlisted,
+            JobApplication.created_at,
+            JobApplication.preview,
+            JobPost.job_id.label("job_code"),
+            User.username,
+            User.email,
+        )
+        .join(JobPost, JobApplication.job_id == JobPost.id)
+        .outerjoin(User, JobApplication.candidate_id == User.id)
+        .filter(*filters)
+    )
+    after = decode_cursor(cursor, sort)
+    if after:
+        value, row_id = after
+        q = q.filter(db.or_(column < value, db.and_(column == value, JobApplication.id < row_id)))
+    rows = q.order_by(column.desc(), JobApplication.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        value = {"score": last.score, "match": last.similarity or 0.0}.get(sort, last.created_at)
+        next_cursor = encode_cursor(sort, value, last.id)
+
+    skills = skills_for_applications([r.id for r in rows])
+    return [
+        {
+            "id": r.id,
+            "job_id": r.job_code,
+            "candidate": r.username or "N/A",
+            "email": r.email or "N/A",
+            "filename": r.original_filename or r.filename,
+            "resume_filename": r.filename,
+            "preview": (r.preview + "...") if r.preview else "",
+            "skills": skills.get(r.id, []),
+            "score": r.score,
+            "similarity": r.similarity,
+            "shortlisted": r.shortlisted,
+            "created_at": r.created_at,
+        }
+        for r in rows
+    ], next_cursor
+
+
+def skills_for_applications(application_ids):
+    """{application id: [skill names in rank order]} in a single query."""
+    if not application_ids:
+        return {}
+    result = {}
+    q = (
+        db.session.query(ApplicationSkill.application_id, Skill.name)
+        .join(Skill, Skill.id == ApplicationSkill.skill_id)
+        .filter(ApplicationSkill.application_id.in_(application_ids))
+        .order_by(ApplicationSkill.application_id, ApplicationSkill.rank)
+    )
+    for application_id, name in q:
+        result.setdefault(application_id, []).append(name)
+    return result
@@ -0,0 +1,99 @@
+"""Counters and histograms rendered in the Prometheus text format.
+
+Values live in this process only; with several app processes each one
+serves its own /metrics and the scraper sums them.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(self.labels, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # label values -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, seconds, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        with self._lock:
+            row = self._values.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    row[i] += 1
+            row[-2] += 1
+            row[-1] += seconds
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, row in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, row):
+                    lines.append(f"{self.name}_bucket{_label_text(self.labels, key, [('le', bound)])} {count}")
+                lines.append(f"{self.name}_bucket{_label_text(self.labels, key, [('le', '+Inf')])} {row[-2]}")
+                lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {row[-1]}")
+                lines.append(f"{self.name}_count{_label_text(self.labels, key)} {row[-2]}")
+        return lines
+
+
+def render():
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------- APP METRICS ---------------------- #
+STAGE_SECONDS = Histogram(
+    "resume_stage_seconds", "Time per analysis stage and file type.", ("stage", "file_type"))
+FILES_TOTAL = Counter(
+    "resume_files_total", "Uploaded files analysed, by source and outcome.", ("source", "outcome"))
+CACHE_TOTAL = Counter(
+    "resume_cache_requests_total", "Cache lookups by cache and result.", ("cache", "result"))
+RECLAIMED_TOTAL = Counter(
+    "resume_reclaimed_total", "Rows and upload files removed by the reclaimer.", ("kind",))
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency by route.", ("method", "route", "status"))
@@ -1,10 +1,17 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+import hashlib
+import zlib
 
 db = SQLAlchemy()
 
+PREVIEW_CHARS = 200  # leading characters of the text kept on listing rows
+
 # ---------------------- USER ---------------------- #
 class User(UserMixin, db.Model):
     __tablename__ = 'user'
@@ -15,6 +22,9 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(128), nullable=False)
     role = db.Column(db.String(20), nullable=False)  # "hr" or "candidate"
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # bumped by touch_jobs() whenever one of this HR user's jobs changes
+    jobs_revision = db.Column(db.Integer, nullable=False, default=0)
+    jobs_changed_at = db.Column(db.DateTime)
 
     resumes = db.relationship('Resume', backref='candidate', lazy=True)
     job_posts = db.relationship('JobPost', backref='hr', lazy=True)
@@ -32,10 +42,30 @@ class Resume(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False)
-    text = db.Column(db.Text)
+    text_id = db.Column(db.Integer, db.ForeignKey('document_text.id'))  # extracted text, see DocumentText
+    preview = db.Column(db.String(PREVIEW_CHARS))
     detected_skills = db.Column(db.String(500))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    original_filename = db.Column(db.String(255))  # name as uploaded; `filename` is the stored copy
+
+    __table_args__ = (
+        db.Index('ix_resume_user_created', 'user_id', 'created_at'),
+        db.Index('ix_resume_text', 'text_id'),
+        db.Index('ix_resume_filename', 'filename'),  # upload reference counts, see reclaim.py
+    )
+
+    skill_links = db.relationship('ResumeSkill', lazy='selectin', order_by='ResumeSkill.rank',
+                                  cascade='all, delete-orphan')
+    document = db.relationship('DocumentText', lazy='select')
+
+    @property
+    def skill_names(self):
+        return [link.skill.name for link in self.skill_links]
+
+    @property
+    def text(self):
+        return self.document.text if self.document else ''
 
 # ---------------------- JOB POST ---------------------- #
 class JobPost(db.Model):
@@ -47,18 +77,593 @@ class JobPost(db.Model):
     description = db.Column(db.Text, nullable=False)
     hr_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # skills detected in `description`, stored so scoring never re-parses it;
+    # description_hash tells whether the stored profile is still current
+    required_skills = db.Column(db.Text)
+    description_hash = db.Column(db.String(64))
+    term_vector = db.Column(db.LargeBinary)  # packed TF vector of the description, see scoring.py
+    # bumped by touch_jobs() on every write to the job or its applications
+    revision = db.Column(db.Integer, nullable=False, default=0)
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # set by delete_job / TEMP retention; the rows go in the background (reclaim.py)
+    deleted_at = db.Column(db.DateTime)
 
     applications = db.relationship('JobApplication', backref='job_post', lazy=True)
 
+    # the HR job list orders by date; bulk results filter hr_id + a job_id range (is_temp_job)
+    __table_args__ = (
+        db.Index('ix_job_post_hr_created', 'hr_id', 'created_at'),
+        db.Index('ix_job_post_hr_job_id', 'hr_id', 'job_id'),
+    )
+
+def is_temp_job():
+    """job_id starts with 'TEMP-' (bulk uploads), as a range the hr_id/job_id index can seek;
+    SQLite's LIKE is case-insensitive, so it cannot use that index."""
+    return db.and_(JobPost.job_id >= 'TEMP-', JobPost.job_id < 'TEMP.')
+
+
 # ---------------------- JOB APPLICATION ---------------------- #
+SHORTLIST_SCORE = 60  # ATS score at which an application is shortlisted, however it arrived
+
 class JobApplication(db.Model):
     __tablename__ = 'job_application'
 
     id = db.Column(db.Integer, primary_key=True)
     job_id = db.Column(db.Integer, db.ForeignKey('job_post.id'), nullable=True)
     candidate_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    resume_text = db.Column(db.Text)
-    detected_skills = db.Column(db.Text)
+    text_id = db.Column(db.Integer, db.ForeignKey('document_text.id'))  # resume text, see DocumentText
+    preview = db.Column(db.String(PREVIEW_CHARS))
+    detected_skills = db.Column(db.Text)  # legacy; skills live in application_skill
     score = db.Column(db.Integer, default=0)
     shortlisted = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    filename = db.Column(db.String(255))  # stored upload this application was scored from
+    original_filename = db.Column(db.String(255))  # name as uploaded
+    term_vector = db.Column(db.LargeBinary)  # packed TF vector of the resume text
+    similarity = db.Column(db.Float)  # TF-IDF cosine to the job, refreshed when the job is re-ranked
+
+    # candidate listings page through a job's applications by date or score;
+    # the candidate dashboard lists a user's applications by date
+    __table_args__ = (
+        db.Index('ix_job_application_job_created', 'job_id', 'created_at'),
+        db.Index('ix_job_application_job_score', 'job_id', 'score'),
+        db.Index('ix_job_application_candidate_created', 'candidate_id', 'created_at'),
+        db.Index('ix_job_application_text', 'text_id'),  # full-text search hits -> applications
+        db.Index('ix_job_application_filename', 'filename'),
+    )
+
+    skill_links = db.relationship('ApplicationSkill', lazy='selectin', order_by='ApplicationSkill.rank',
+                                  cascade='all, delete-orphan')
+    document = db.relationship('DocumentText', lazy='select')
+
+    @property
+    def skill_names(self):
+        return [link.skill.name for link in self.skill_links]
+
+    @property
+    def text(self):
+        return self.document.text if self.document else ''
+
+# ---------------------- SKILLS ---------------------- #
+# Detected skills are stored as rows, ranked in detection order, so "who has
+# kafka and terraform" is an indexed lookup instead of parsing strings.
+class Skill(db.Model):
+    __tablename__ = 'skill'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+
+class ResumeSkill(db.Model):
+    __tablename__ = 'resume_skill'
+    __table_args__ = (db.Index('ix_resume_skill_skill_resume', 'skill_id', 'resume_id'),)
+
+    resume_id = db.Column(db.Integer, db.ForeignKey('resume.id'), primary_key=True)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skill.id'), primary_key=True)
+    rank = db.Column(db.Integer, nullable=False, default=0)
+
+    skill = db.relationship('Skill', lazy='joined')
+
+class ApplicationSkill(db.Model):
+    __tablename__ = 'application_skill'
+    __table_args__ = (db.Index('ix_application_skill_skill_application', 'skill_id', 'application_id'),)
+
+    application_id = db.Column(db.Integer, db.ForeignKey('job_application.id'), primary_key=True)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skill.id'), primary_key=True)
+    rank = db.Column(db.Integer, nullable=False, default=0)
+
+    skill = db.relationship('Skill', lazy='joined')
+
+# name -> id per database; dropped on rollback in case it held ids that were
+# inserted by the transaction being rolled back
+_skill_ids = {}
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_skill_ids(session):
+    _skill_ids.clear()
+
+
+def skill_ids(names):
+    """Map skill names to Skill ids, inserting the ones not seen before."""
+    known = _skill_ids.setdefault(str(db.engine.url), {})
+    missing = [n for n in set(names) if n not in known]
+    if missing:
+        for skill in Skill.query.filter(Skill.name.in_(missing)):
+            known[skill.name] = skill.id
+        for name in missing:
+            if name in known:
+                continue
+            skill = Skill(name=name)
+            try:
+                with db.session.begin_nested():
+                    db.session.add(skill)
+            except IntegrityError:  # inserted concurrently by another process
+                skill = Skill.query.filter_by(name=name).one()
+            known[name] = skill.id
+    return {n: known[n] for n in names}
+
+
+def skill_links(link_model, names):
+    """ResumeSkill / ApplicationSkill rows for ``names``, keeping their order as rank."""
+    names = list(dict.fromkeys(n for n in names if n))
+    ids = skill_ids(names)
+    return [link_model(skill_id=ids[name], rank=rank) for rank, name in enumerate(names)]
+
+# ---------------------- DOCUMENT TEXT ---------------------- #
+# Extracted text is stored once per distinct text, zlib-compressed, however
+# many resumes, applications and cached uploads share it. Those rows keep
+# only a text_id and a short preview for listings; the body is deferred, so
+# it is read only when something actually uses the text.
+class DocumentText(db.Model):
+    __tablename__ = 'document_text'
+
+    id = db.Column(db.Integer, primary_key=True)
+    digest = db.Column(db.String(64), unique=True, nullable=False)  # SHA-256 of the text
+    chars = db.Column(db.Integer, nullable=False)
+    body = db.deferred(db.Column(db.LargeBinary, nullable=False))
+    indexed = db.Column(db.Boolean, nullable=False, default=False)  # added to SEARCH_TABLE
+    # refreshed whenever store_texts() hands the id out again; the reclaimer
+    # leaves recently used texts alone even if nothing points to them yet
+    used_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @property
+    def text(self):
+        return zlib.decompress(self.body).decode('utf-8')
+
+
+# Full-text index over DocumentText (SQLite FTS5, rowid = document id). It is
+# contentless: only the terms are kept, the text itself stays compressed above.
+SEARCH_TABLE = 'document_search'
+SEARCH_TABLE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "body, content='', tokenize='porter unicode61 remove_diacritics 2')"
+)
+
+
+def search_supported():
+    return db.engine.dialect.name == 'sqlite'
+
+
+def index_texts(documents):
+    """Add ``(document id, text)`` pairs to the full-text index; caller commits."""
+    if not documents or not search_supported():
+        return
+    db.session.execute(
+        db.text(f'INSERT INTO {SEARCH_TABLE} (rowid, body) VALUES (:id, :body)'),
+        [{'id': doc_id, 'body': text} for doc_id, text in documents],
+    )
+    db.session.execute(
+        db.update(DocumentText)
+        .where(DocumentText.id.in_([doc_id for doc_id, _ in documents]))
+        .values(indexed=True)
+    )
+
+
+def unindex_texts(documents):
+    """Drop ``(document id, text)`` pairs from the full-text index; caller commits.
+
+    The index keeps no text, so FTS5 needs the exact text that was indexed.
+    """
+    if not documents or not search_supported():
+        return
+    db.session.execute(
+        db.text(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, body) VALUES ('delete', :id, :body)"),
+        [{'id': doc_id, 'body': text} for doc_id, text in documents],
+    )
+
+
+def _text_digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def store_texts(texts):
+    """DocumentText ids for ``texts`` in order (None for empty ones), storing new texts."""
+    digests = [_text_digest(t) if t else None for t in texts]
+    unique = {d: t for d, t in zip(digests, texts) if d}
+    if unique:
+        # this write takes the database lock first, so a text found below
+        # cannot be reclaimed before the caller's rows point to it
+        db.session.execute(
+            db.update(DocumentText).where(DocumentText.digest.in_(list(unique)))
+            .values(used_at=datetime.utcnow()),
+            execution_options={'synchronize_session': False},
+        )
+    ids = dict(
+        db.session.query(DocumentText.digest, DocumentText.id)
+        .filter(DocumentText.digest.in_(list(unique)))
+    ) if unique else {}
+    missing = [
+        {'digest': d, 'chars': len(t), 'body': zlib.compress(t.encode('utf-8'))}
+        for d, t in unique.items() if d not in ids
+    ]
+    if missing:
+        inserted = missing
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(DocumentText), missing)
+        except IntegrityError:  # another process stored some of them first
+            inserted = []
+            for row in missing:
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(db.insert(DocumentText), [row])
+                    inserted.append(row)
+                except IntegrityError:
+                    pass
+        ids.update(
+            db.session.query(DocumentText.digest, DocumentText.id)
+            .filter(DocumentText.digest.in_([row['digest'] for row in missing]))
+        )
+        # indexed in the same transaction, so a stored text is always searchable
+        index_texts([(ids[row['digest']], unique[row['digest']]) for row in inserted])
+    return [ids.get(d) for d in digests]
+
+
+def text_columns(text):
+    """``text_id`` and ``preview`` values for a Resume or JobApplication."""
+    return {'text_id': store_texts([text])[0], 'preview': (text or '')[:PREVIEW_CHARS]}
+
+# ---------------------- PAGE REVISIONS ---------------------- #
+# Counters that other processes compare with what they loaded, for changes
+# they cannot see otherwise: the skill index only loads resumes above the
+# highest id it has, so removing resumes bumps 'resumes' (see reclaim.py).
+class Generation(db.Model):
+    __tablename__ = 'generation'
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+def bump_generation(name):
+    """Caller commits, in the transaction that made the change."""
+    db.session.execute(
+        db.text('INSERT INTO generation (name, value) VALUES (:name, 1) '
+                'ON CONFLICT (name) DO UPDATE SET value = value + 1'),
+        {'name': name},
+    )
+
+
+def current_generation(name):
+    return db.session.query(Generation.value).filter_by(name=name).scalar() or 0
+
+
+# HR pages are cached under JobPost.revision (candidates of one job) or
+# User.jobs_revision (dashboard and bulk results). Anything that writes a job
+# or its applications calls touch_jobs() in the same transaction.
+def touch_jobs(job_ids):
+    """Bump the revision of these jobs and of their HR users; caller commits."""
+    job_ids = list({i for i in job_ids if i is not None})
+    if not job_ids:
+        return
+    now = datetime.utcnow()
+    db.session.execute(
+        db.update(JobPost).where(JobPost.id.in_(job_ids))
+        .values(revision=JobPost.revision + 1, changed_at=now),
+        execution_options={'synchronize_session': 'fetch'},
+    )
+    db.session.execute(
+        db.update(User).where(User.id.in_(db.select(JobPost.hr_id).where(JobPost.id.in_(job_ids))))
+        .values(jobs_revision=User.jobs_revision + 1, jobs_changed_at=now),
+        execution_options={'synchronize_session': 'fetch'},
+    )
+
+# ---------------------- STORED FILES ---------------------- #
+# One row per unique upload (by SHA-256). text_id/detected_skills cache the
+# analysis so a repeat upload skips extraction and NLP; they are cleared by
+# cache eviction while the row and the file itself stay. Row and file go
+# once no resume, application or task refers to the file (reclaim.py).
+class ResumeFile(db.Model):
+    __tablename__ = 'resume_file'
+
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), unique=True, nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    size = db.Column(db.Integer)
+    text_id = db.Column(db.Integer, db.ForeignKey('document_text.id'))
+    detected_skills = db.Column(db.Text)
+    # SkillMatcher.version that produced detected_skills
+    taxonomy_version = db.Column(db.String(12))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    __table_args__ = (db.Index('ix_resume_file_text', 'text_id'),)
+
+    document = db.relationship('DocumentText', lazy='select')
+
+    @property
+    def text(self):
+        return self.document.text if self.document else None
+
+# ---------------------- ANALYSIS QUEUE ---------------------- #
+APPLICATION_RERANK = 'application'  # payload of a rerank queued by a new application, not an edit
+
+class AnalysisBatch(db.Model):
+    __tablename__ = 'analysis_batch'
+
+    id = db.Column(db.Integer, primary_key=True)
+    batch_id = db.Column(db.String(32), unique=True, nullable=False)
+    hr_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('job_post.id'), nullable=False)
+    required_skills = db.Column(db.Text)  # comma-joined, scored against every file
+    total = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    tasks = db.relationship('AnalysisTask', backref='batch', lazy=True)
+
+class AnalysisTask(db.Model):
+    __tablename__ = 'analysis_task'
+
+    id = db.Column(db.Integer, primary_key=True)
+    batch_id = db.Column(db.Integer, db.ForeignKey('analysis_batch.id'), nullable=False, index=True)
+    # analyse: one uploaded file; rescore: payload is a JSON list of application
+    # ids to score again; rerank: refresh the job's similarity column
+    kind = db.Column(db.String(20), default='analyse')
+    payload = db.Column(db.Text)
+    filename = db.Column(db.String(255), nullable=False, index=True)  # '' for rescore/rerank
+    original_filename = db.Column(db.String(255))  # name as uploaded, passed on to the rows it creates
+    sha256 = db.Column(db.String(64))
+    status = db.Column(db.String(20), default='queued', index=True)  # queued/running/done/failed
+    worker = db.Column(db.String(64))
+    attempts = db.Column(db.Integer, default=0)
+    error = db.Column(db.Text)
+    application_id = db.Column(db.Integer, db.ForeignKey('job_application.id'))
+    resume_id = db.Column(db.Integer, db.ForeignKey('resume.id'))  # the HR's copy of the upload
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    application = db.relationship('JobApplication', lazy=True)
+
+# ---------------------- SCHEMA UPGRADES ---------------------- #
+# db.create_all() only creates missing tables, so columns added to existing
+# models are applied here for databases created by an older version.
+ADDED_COLUMNS = {
+    'user': {
+        'jobs_revision': 'INTEGER NOT NULL DEFAULT 0',
+        'jobs_changed_at': 'DATETIME',
+    },
+    'job_post': {
+        'required_skills': 'TEXT',
+        'description_hash': 'VARCHAR(64)',
+        'term_vector': 'BLOB',
+        'revision': 'INTEGER NOT NULL DEFAULT 0',
+        'changed_at': 'DATETIME',
+        'deleted_at': 'DATETIME',
+    },
+    'resume': {
+        'original_filename': 'VARCHAR(255)',
+        'text_id': 'INTEGER REFERENCES document_text (id)',
+        'preview': f'VARCHAR({PREVIEW_CHARS})',
+    },
+    'analysis_task': {
+        'sha256': 'VARCHAR(64)',
+        'kind': "VARCHAR(20) DEFAULT 'analyse'",
+        'payload': 'TEXT',
+        'resume_id': 'INTEGER REFERENCES resume (id)',
+        'original_filename': 'VARCHAR(255)',
+    },
+    'job_application': {
+        'filename': 'VARCHAR(255)',
+        'original_filename': 'VARCHAR(255)',
+        'term_vector': 'BLOB',
+        'similarity': 'FLOAT',
+        'text_id': 'INTEGER REFERENCES document_text (id)',
+        'preview': f'VARCHAR({PREVIEW_CHARS})',
+    },
+    'resume_file': {
+        'taxonomy_version': 'VARCHAR(12)',
+        'text_id': 'INTEGER REFERENCES document_text (id)',
+    },
+    'document_text': {
+        'indexed': 'BOOLEAN NOT NULL DEFAULT 0',
+        'used_at': 'DATETIME',
+    },
+}
+
+# text columns from before DocumentText, moved out by migrate_inline_text()
+INLINE_TEXT_COLUMNS = (('resume', 'text'), ('job_application', 'resume_text'), ('resume_file', 'text'))
+
+
+def schema_fingerprint():
+    """CRC32 over every table, column and index name the models define."""
+    parts = []
+    for table in db.metadata.sorted_tables:
+        parts.append(table.name)
+        parts.extend(sorted(c.name for c in table.columns))
+        parts.extend(sorted(i.name for i in table.indexes))
+    parts.append(SEARCH_TABLE_DDL)
+    return zlib.crc32(','.join(parts).encode()) & 0x7FFFFFFF
+
+
+def ensure_schema():
+    """create_all() and upgrade_schema(), unless the database already matches.
+
+    On SQLite the fingerprint of the models is kept in ``PRAGMA user_version``
+    once the schema is current, so later starts read one pragma instead of
+    inspecting every table. Returns whether anything ran.
+    """
+    sqlite = db.engine.dialect.name == 'sqlite'
+    fingerprint = schema_fingerprint()
+    if sqlite:
+        with db.engine.connect() as conn:
+            if conn.execute(db.text('PRAGMA user_version')).scalar() == fingerprint:
+                return False
+    db.create_all()
+    upgrade_schema()
+    if sqlite:
+        with db.engine.begin() as conn:
+            conn.execute(db.text(f'PRAGMA user_version = {fingerprint}'))
+    return True
+
+
+def upgrade_schema():
+    inspector = db.inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table, columns in ADDED_COLUMNS.items():
+            existing = {c['name'] for c in inspector.get_columns(table)}
+            for name, ddl in columns.items():
+                if name not in existing:
+                    conn.execute(db.text(f'ALTER TABLE {table} ADD COLUMN {name} {ddl}'))
+        # create_all() skips tables that already exist, indexes included
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        if search_supported():
+            conn.execute(db.text(SEARCH_TABLE_DDL))
+    migrate_legacy_skills()
+    migrate_inline_text()
+    backfill_search_index()
+    link_task_resumes()
+    backfill_shortlist()
+    backfill_application_names()
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run ``PRAGMA name=value`` on every new connection to a SQLite file."""
+    if engine.dialect.name != 'sqlite' or engine.url.database in (None, '', ':memory:'):
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+def migrate_legacy_skills(chunk_size=500):
+    """Move comma-joined detected_skills into the skill tables.
+
+    Bulk-upload applications stored 'filename||skills'; the filename goes to
+    JobApplication.filename. Converted rows get detected_skills = NULL, so the
+    migration only ever touches rows it has not seen.
+    """
+    for model, link_model in ((Resume, ResumeSkill), (JobApplication, ApplicationSkill)):
+        while True:
+            rows = model.query.filter(model.detected_skills.isnot(None)).limit(chunk_size).all()
+            if not rows:
+                break
+            for row in rows:
+                skills = row.detected_skills
+                if model is JobApplication and '||' in skills:
+                    filename, skills = skills.split('||', 1)
+                    row.filename = row.filename or filename
+                row.skill_links = skill_links(link_model, skills.split(',') if skills else [])
+                row.detected_skills = None
+            db.session.commit()
+
+
+def migrate_inline_text(chunk_size=500):
+    """Move text stored inline on each row (INLINE_TEXT_COLUMNS) into DocumentText.
+
+    Rows are converted in chunks, then the emptied column is dropped and the
+    file vacuumed once so the space the duplicated copies held is returned.
+    """
+    inspector = db.inspect(db.engine)
+    moved = False
+    for table, column in INLINE_TEXT_COLUMNS:
+        if column not in {c['name'] for c in inspector.get_columns(table)}:
+            continue
+        assignments = 'text_id = :text_id' + (', preview = :preview' if table != 'resume_file' else '')
+        while True:
+            rows = db.session.execute(
+                db.text(f'SELECT id, {column} FROM {table} WHERE {column} IS NOT NULL LIMIT :limit'),
+                {'limit': chunk_size},
+            ).all()
+            if not rows:
+                break
+            text_ids = store_texts([text for _, text in rows])
+            db.session.execute(
+                db.text(f'UPDATE {table} SET {assignments}, {column} = NULL WHERE id = :id'),
+                [{'id': row_id, 'text_id': text_id, 'preview': text[:PREVIEW_CHARS]}
+                 for (row_id, text), text_id in zip(rows, text_ids)],
+            )
+            db.session.commit()
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(db.text(f'ALTER TABLE {table} DROP COLUMN {column}'))
+        except OperationalError:  # SQLite before 3.35; the column stays, empty
+            pass
+        moved = True
+    if moved and db.engine.dialect.name == 'sqlite':
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(db.text('VACUUM'))
+
+
+def backfill_search_index(chunk_size=500):
+    """Add documents stored before the full-text index existed to it."""
+    if not search_supported():
+        return
+    while True:
+        documents = (
+            DocumentText.query.filter_by(indexed=False)
+            .options(db.undefer(DocumentText.body))
+            .order_by(DocumentText.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not documents:
+            break
+        index_texts([(doc.id, doc.text) for doc in documents])
+        db.session.commit()
+
+
+def backfill_shortlist():
+    """Apply the shortlist rule to applications submitted before apply_job set it."""
+    db.session.execute(
+        db.update(JobApplication)
+        .where(JobApplication.score >= SHORTLIST_SCORE, db.func.coalesce(JobApplication.shortlisted, False).is_(False))
+        .values(shortlisted=True),
+        execution_options={'synchronize_session': False},
+    )
+    db.session.commit()
+
+
+def backfill_application_names():
+    """Name applications stored before they kept one after the applicant's own resume of the same file."""
+    db.session.execute(db.text("""
+        UPDATE job_application SET original_filename = (
+            SELECT r.original_filename FROM resume r
+            WHERE r.filename = job_application.filename AND r.user_id = job_application.candidate_id
+              AND r.original_filename IS NOT NULL
+            ORDER BY r.id DESC LIMIT 1)
+        WHERE original_filename IS NULL AND filename IS NOT NULL
+    """))
+    db.session.commit()
+
+
+def link_task_resumes():
+    """Fill AnalysisTask.resume_id for bulk uploads analysed before it existed.
+
+    The queue wrote each Resume with created_at equal to its task's
+    finished_at, which identifies the pair.
+    """
+    db.session.execute(db.text("""
+        UPDATE analysis_task SET resume_id = (
+            SELECT r.id FROM resume r JOIN analysis_batch b ON b.hr_id = r.user_id
+            WHERE b.id = analysis_task.batch_id AND r.filename = analysis_task.filename
+              AND r.created_at = analysis_task.finished_at
+            ORDER BY r.id LIMIT 1)
+        WHERE resume_id IS NULL AND status = 'done' AND kind = 'analyse'
+    """))
+    db.session.commit()
@@ -0,0 +1,71 @@
+"""Bulk writes for analysed uploads.
+
+The rows produced from a group of files (Resume or JobApplication plus their
+skill links) go in with two multi-row INSERTs in the caller's transaction,
+instead of one ORM flush per object. If a multi-row INSERT fails, the rows
+are retried one at a time under savepoints, so one bad file is reported
+without losing the others.
+"""
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import (
+    db, Resume, JobApplication, ResumeSkill, ApplicationSkill, PREVIEW_CHARS, skill_ids, store_texts
+)
+
+SKILL_LINKS = {
+    Resume: (ResumeSkill, 'resume_id'),
+    JobApplication: (ApplicationSkill, 'application_id'),
+}
+
+
+def _insert(model, rows, ids):
+    link_model, key = SKILL_LINKS[model]
+    new_ids = db.session.execute(
+        db.insert(model).returning(model.id, sort_by_parameter_order=True),
+        [row['values'] for row in rows],
+    ).scalars().all()
+    links = [
+        {key: row_id, 'skill_id': ids[name], 'rank': rank}
+        for row_id, row in zip(new_ids, rows)
+        for rank, name in enumerate(row['skills'])
+    ]
+    if links:
+        db.session.execute(db.insert(link_model), links)
+    return new_ids
+
+
+def insert_analysed(model, rows):
+    """Insert Resume or JobApplication ``rows`` with their skill links.
+
+    Each row is a dict of column values plus a ``skills`` list in rank order
+    and the extracted ``text``, which is stored through store_texts (texts
+    repeated in the group are written once). Returns ``(id, None)`` or
+    ``(None, error)`` per row, in order. Nothing is committed; the caller
+    commits the whole group once.
+    """
+    if not rows:
+        return []
+    text_ids = store_texts([row.get('text') or '' for row in rows])
+    rows = [
+        {'values': {**{k: v for k, v in row.items() if k not in ('skills', 'text')},
+                    'text_id': text_id, 'preview': (row.get('text') or '')[:PREVIEW_CHARS]},
+         'skills': list(dict.fromkeys(s for s in row['skills'] if s))}
+        for row, text_id in zip(rows, text_ids)
+    ]
+    ids = skill_ids({name for row in rows for name in row['skills']})
+
+    if len(rows) > 1:
+        try:
+            with db.session.begin_nested():
+                return [(row_id, None) for row_id in _insert(model, rows, ids)]
+        except SQLAlchemyError:
+            pass  # find the offending rows below
+
+    results = []
+    for row in rows:
+        try:
+            with db.session.begin_nested():
+                results.append((_insert(model, [row], ids)[0], None))
+        except SQLAlchemyError as exc:
+            results.append((None, str(getattr(exc, 'orig', None) or exc)))
+    return results
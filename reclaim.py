@@ -0,0 +1,277 @@
+"""Background clean-up of deleted jobs, expired bulk uploads and unused files.
+
+delete_job and the TEMP job retention policy only set JobPost.deleted_at.
+The reclaimer then removes the job's tasks, the HR's copies of its bulk
+uploads, its applications and finally the job, at most ``chunk_size`` rows
+per transaction with a pause in between, so the SQLite write lock is only
+ever held for a few milliseconds at a time.
+
+Uploads are shared by content (storage.py), so a file goes only once no
+Resume, JobApplication or AnalysisTask refers to it; a stored text once no
+row points at it. Both must also be unused for the grace period, which
+covers an upload that is stored but whose rows are not committed yet.
+"""
+import logging
+import os
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+
+from metrics import RECLAIMED_TOTAL
+from models import (
+    db, Resume, ResumeSkill, JobPost, JobApplication, ApplicationSkill, ResumeFile,
+    AnalysisBatch, AnalysisTask, DocumentText, touch_jobs, unindex_texts, bump_generation, is_temp_job,
+)
+
+log = logging.getLogger(__name__)
+
+_wake = threading.Event()
+_reclaimers = []
+
+
+def wake_reclaimer():
+    """Start a pass now instead of at the next interval."""
+    _wake.set()
+
+
+def _delete(model, *criteria):
+    return db.session.execute(
+        db.delete(model).where(*criteria), execution_options={'synchronize_session': False}
+    ).rowcount
+
+
+def _commit(pause):
+    db.session.commit()
+    if pause:
+        time.sleep(pause)
+
+
+def mark_jobs_deleted(job_ids):
+    """Hide jobs from every page and leave their rows to the reclaimer; caller commits."""
+    job_ids = list(job_ids)
+    if not job_ids:
+        return
+    now = datetime.utcnow()
+    touch_jobs(job_ids)
+    db.session.execute(
+        db.update(JobPost).where(JobPost.id.in_(job_ids)).values(deleted_at=now),
+        execution_options={'synchronize_session': 'fetch'},
+    )
+    batches = db.select(AnalysisBatch.id).where(AnalysisBatch.job_id.in_(job_ids))
+    db.session.execute(
+        db.update(AnalysisTask)
+        .where(AnalysisTask.batch_id.in_(batches), AnalysisTask.status == 'queued')
+        .values(status='failed', error='job deleted', finished_at=now),
+        execution_options={'synchronize_session': False},
+    )
+
+
+def expire_temp_jobs(retention_days):
+    """Mark TEMP bulk-upload jobs untouched for ``retention_days`` as deleted."""
+    if not retention_days:
+        return 0
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    busy = (
+        db.select(AnalysisBatch.job_id)
+        .join(AnalysisTask, AnalysisTask.batch_id == AnalysisBatch.id)
+        .where(AnalysisTask.status.in_(('queued', 'running')))
+    )
+    expired = [
+        job_id for (job_id,) in
+        db.session.query(JobPost.id).filter(
+            is_temp_job(),
+            JobPost.deleted_at.is_(None),
+            db.func.coalesce(JobPost.changed_at, JobPost.created_at) < cutoff,
+            JobPost.id.notin_(busy),
+        )
+    ]
+    mark_jobs_deleted(expired)
+    db.session.commit()
+    return len(expired)
+
+
+def purge_job(job_id, chunk_size, pause=0):
+    """Remove a deleted job and everything hanging off it, a chunk per transaction.
+
+    Returns the number of resumes removed, or None while one of the job's
+    tasks is still running (the job is tried again on the next pass).
+    """
+    batches = db.select(AnalysisBatch.id).where(AnalysisBatch.job_id == job_id)
+    if db.session.query(AnalysisTask.id).filter(AnalysisTask.batch_id.in_(batches),
+                                                AnalysisTask.status == 'running').first():
+        return None
+
+    # tasks first: they point at the applications and at the HR's resume copies
+    resumes = 0
+    while True:
+        tasks = (
+            db.session.query(AnalysisTask.id, AnalysisTask.resume_id)
+            .filter(AnalysisTask.batch_id.in_(batches))
+            .limit(chunk_size)
+            .all()
+        )
+        if not tasks:
+            break
+        _delete(AnalysisTask, AnalysisTask.id.in_([task_id for task_id, _ in tasks]))
+        resume_ids = [resume_id for _, resume_id in tasks if resume_id is not None]
+        if resume_ids:
+            _delete(ResumeSkill, ResumeSkill.resume_id.in_(resume_ids))
+            resumes += _delete(Resume, Resume.id.in_(resume_ids))
+            bump_generation('resumes')  # every process's skill index reloads
+        _commit(pause)
+    _delete(AnalysisBatch, AnalysisBatch.job_id == job_id)
+
+    applications = 0
+    while True:
+        ids = [i for (i,) in db.session.query(JobApplication.id).filter_by(job_id=job_id).limit(chunk_size)]
+        if not ids:
+            break
+        _delete(ApplicationSkill, ApplicationSkill.application_id.in_(ids))
+        applications += _delete(JobApplication, JobApplication.id.in_(ids))
+        _commit(pause)
+    _delete(JobPost, JobPost.id == job_id)
+    db.session.commit()
+
+    RECLAIMED_TOTAL.inc(kind='job')
+    RECLAIMED_TOTAL.inc(applications, kind='application')
+    RECLAIMED_TOTAL.inc(resumes, kind='resume')
+    return resumes
+
+
+def _remove_files(folder, names, cutoff):
+    referenced = set()
+    for column in (Resume.filename, JobApplication.filename, AnalysisTask.filename):
+        referenced.update(name for (name,) in db.session.query(column).filter(column.in_(names)).distinct())
+    unused = [name for name in names if name not in referenced]
+    if not unused:
+        return 0
+    # the analysis cached for a file goes with it
+    _delete(ResumeFile, ResumeFile.sha256.in_([name.rsplit('.', 1)[0] for name in unused]))
+    db.session.commit()
+
+    removed = 0
+    for name in unused:
+        path = os.path.join(folder, name)
+        trash = os.path.join(folder, '.reclaim-' + name)
+        try:
+            os.replace(path, trash)
+        except FileNotFoundError:
+            continue
+        # an upload of the same content touches the file before its rows are
+        # written (storage.store_upload); if that happened, it is in use again
+        if os.stat(trash).st_mtime >= cutoff:
+            os.replace(trash, path)
+        else:
+            os.remove(trash)
+            removed += 1
+    return removed
+
+
+def remove_unused_files(folder, chunk_size, grace_seconds, pause=0):
+    """Delete uploads nothing refers to that have not been touched for the grace period."""
+    cutoff = time.time() - grace_seconds
+    removed, names = 0, []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            try:
+                if not entry.is_file() or entry.stat().st_mtime >= cutoff:
+                    continue
+                if entry.name.startswith('.'):
+                    # left by an upload or a removal that was interrupted
+                    os.remove(entry.path)
+                    continue
+            except FileNotFoundError:
+                continue
+            names.append(entry.name)
+            if len(names) == chunk_size:
+                removed += _remove_files(folder, names, cutoff)
+                names = []
+                _commit(pause)
+    if names:
+        removed += _remove_files(folder, names, cutoff)
+    RECLAIMED_TOTAL.inc(removed, kind='file')
+    return removed
+
+
+def remove_unused_texts(chunk_size, grace_seconds, pause=0):
+    """Delete stored texts (and their search index entries) that no row points at."""
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    unused = (
+        ~db.exists().where(Resume.text_id == DocumentText.id),
+        ~db.exists().where(JobApplication.text_id == DocumentText.id),
+        ~db.exists().where(ResumeFile.text_id == DocumentText.id),
+        db.or_(DocumentText.used_at.is_(None), DocumentText.used_at < cutoff),
+    )
+    removed, after = 0, 0
+    while True:
+        ids = [
+            doc_id for (doc_id,) in
+            db.session.query(DocumentText.id).filter(DocumentText.id > after, *unused)
+            .order_by(DocumentText.id).limit(chunk_size)
+        ]
+        if not ids:
+            break
+        after = ids[-1]
+        # checked again under the write lock: store_texts() may have reused one
+        gone = db.session.execute(
+            db.delete(DocumentText).where(DocumentText.id.in_(ids), *unused)
+            .returning(DocumentText.id, DocumentText.body, DocumentText.indexed),
+            execution_options={'synchronize_session': False},
+        ).all()
+        unindex_texts([(doc_id, zlib.decompress(body).decode('utf-8')) for doc_id, body, indexed in gone if indexed])
+        removed += len(gone)
+        _commit(pause)
+    RECLAIMED_TOTAL.inc(removed, kind='text')
+    return removed
+
+
+def reclaim(config, on_resumes_removed=None):
+    """One full pass; returns what was removed."""
+    chunk, pause = config['RECLAIM_CHUNK_SIZE'], config['RECLAIM_PAUSE_SECONDS']
+    counts = {'expired_jobs': expire_temp_jobs(config['TEMP_JOB_RETENTION_DAYS']), 'jobs': 0, 'resumes': 0}
+    for (job_id,) in db.session.query(JobPost.id).filter(JobPost.deleted_at.isnot(None)).all():
+        resumes = purge_job(job_id, chunk, pause)
+        if resumes is not None:
+            counts['jobs'] += 1
+            counts['resumes'] += resumes
+    if counts['resumes'] and on_resumes_removed:
+        on_resumes_removed()
+    # files first: dropping their cached analysis can leave texts unused
+    counts['files'] = remove_unused_files(config['UPLOAD_FOLDER'], chunk, config['RECLAIM_GRACE_SECONDS'], pause)
+    counts['texts'] = remove_unused_texts(chunk, config['RECLAIM_GRACE_SECONDS'], pause)
+    return counts
+
+
+class Reclaimer(threading.Thread):
+    def __init__(self, app, on_resumes_removed=None):
+        super().__init__(daemon=True, name='reclaimer')
+        self.app = app
+        self.on_resumes_removed = on_resumes_removed
+        self.stopping = threading.Event()
+
+    def run(self):
+        while not self.stopping.is_set():
+            with self.app.app_context():
+                try:
+                    counts = reclaim(self.app.config, self.on_resumes_removed)
+                    if any(counts.values()):
+                        log.info('reclaimed %s', counts)
+                except Exception:
+                    log.exception('reclaimer failed')
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+            _wake.wait(self.app.config['RECLAIM_INTERVAL_SECONDS'])
+            _wake.clear()
+
+    def stop(self):
+        self.stopping.set()
+        _wake.set()
+
+
+def start_reclaimer(app, on_resumes_removed=None):
+    reclaimer = Reclaimer(app, on_resumes_removed)
+    reclaimer.start()
+    _reclaimers.append(reclaimer)
+    return reclaimer
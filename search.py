@@ -0,0 +1,132 @@
+"""Full-text search over stored resume text for the HR search endpoint.
+
+Queries run against the FTS5 index in models.SEARCH_TABLE, joined to the
+applications or resumes that use each document and ranked by bm25. The index
+keeps no text of its own, so snippets are cut in Python from the compressed
+DocumentText bodies of the rows on the page only.
+"""
+import re
+
+from markupsafe import Markup, escape
+
+from models import db, DocumentText, SEARCH_TABLE
+
+SCOPES = ("applications", "resumes")
+MAX_TERMS = 16
+SNIPPET_CHARS = 240
+
+_TOKEN = re.compile(r"\w+")
+_PART = re.compile(r'"([^"]*)"?|(\S+)')
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 expression.
+
+    Every word must match; ``"quoted words"`` match as a phrase and a
+    trailing ``*`` makes a prefix search. Punctuation never reaches FTS5,
+    so any input is safe. Returns ``(expression, highlight terms)``, or
+    ``(None, [])`` when nothing searchable is left.
+    """
+    parts, terms = [], []
+    for phrase, word in _PART.findall(text or ""):
+        tokens = _TOKEN.findall(phrase or word)
+        if not tokens:
+            continue
+        prefix = bool(word) and word.endswith("*")
+        parts.append('"' + " ".join(tokens) + '"' + ("*" if prefix else ""))
+        terms.extend(tokens)
+        if len(parts) == MAX_TERMS:
+            break
+    if not parts:
+        return None, []
+    return " AND ".join(parts), list(dict.fromkeys(t.lower() for t in terms))
+
+
+def snippet(text, terms, width=SNIPPET_CHARS):
+    """HTML excerpt around the first hit, with every hit wrapped in <mark>."""
+    text = " ".join(text.split())
+    # the index stems words, so highlight anything starting with a term
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(t) for t in terms) + r")\w*", re.I) if terms else None
+    first = pattern.search(text) if pattern else None
+    start = 0
+    if first and first.start() > width // 3:
+        start = text.rfind(" ", 0, first.start() - width // 3) + 1
+    end = min(len(text), start + width)
+    if end < len(text) and text.rfind(" ", start, end) > start:
+        end = text.rfind(" ", start, end)
+    excerpt = text[start:end]
+
+    out, pos = [], 0
+    for hit in (pattern.finditer(excerpt) if pattern else ()):
+        out.append(escape(excerpt[pos:hit.start()]))
+        out.append(Markup("<mark>%s</mark>") % hit.group())
+        pos = hit.end()
+    out.append(escape(excerpt[pos:]))
+    return ("…" if start else "") + Markup("").join(out) + ("…" if end < len(text) else "")
+
+
+_APPLICATIONS_SQL = f"""
+    SELECT a.id, COALESCE(a.original_filename, a.filename) AS filename, a.score, a.created_at, a.text_id, p.job_id AS job_code,
+           u.username, u.email, bm25({SEARCH_TABLE}) AS rank
+    FROM {SEARCH_TABLE}
+    JOIN job_application a ON a.text_id = {SEARCH_TABLE}.rowid
+    JOIN job_post p ON p.id = a.job_id
+    LEFT JOIN "user" u ON u.id = a.candidate_id
+    WHERE {SEARCH_TABLE} MATCH :query AND p.hr_id = :hr_id AND p.deleted_at IS NULL {{job_filter}}
+    ORDER BY rank, a.id DESC
+    LIMIT :limit OFFSET :offset
+"""
+
+_RESUMES_SQL = f"""
+    SELECT r.id, COALESCE(r.original_filename, r.filename) AS filename, NULL AS score, r.created_at,
+           r.text_id, NULL AS job_code, u.username, u.email, bm25({SEARCH_TABLE}) AS rank
+    FROM {SEARCH_TABLE}
+    JOIN resume r ON r.text_id = {SEARCH_TABLE}.rowid
+    JOIN "user" u ON u.id = r.user_id
+    WHERE {SEARCH_TABLE} MATCH :query AND (u.role = 'candidate' OR r.user_id = :hr_id)
+    ORDER BY rank, r.id DESC
+    LIMIT :limit OFFSET :offset
+"""
+
+
+def search_page(query, hr_id, scope="applications", job_code=None, page=1, limit=20):
+    """One page of hits visible to ``hr_id``, best match first.
+
+    ``applications`` searches applications to that HR's jobs (optionally one
+    job); ``resumes`` searches candidate resumes and the HR's own uploads.
+    Returns ``(rows, has_more)``.
+    """
+    expression, terms = fts_query(query)
+    if expression is None:
+        return [], False
+    params = {"query": expression, "hr_id": hr_id, "limit": limit + 1, "offset": (page - 1) * limit}
+    if scope == "resumes":
+        sql = _RESUMES_SQL
+    else:
+        sql = _APPLICATIONS_SQL.format(job_filter="AND p.job_id = :job_code" if job_code else "")
+        if job_code:
+            params["job_code"] = job_code
+    rows = db.session.execute(db.text(sql), params).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    documents = {
+        d.id: d for d in
+        DocumentText.query.options(db.undefer(DocumentText.body))
+        .filter(DocumentText.id.in_({r.text_id for r in rows}))
+    }
+    results = []
+    for position, r in enumerate(rows, start=(page - 1) * limit + 1):
+        document = documents.get(r.text_id)
+        results.append({
+            "id": r.id,
+            "job_id": r.job_code,
+            "candidate": r.username or "N/A",
+            "email": r.email or "N/A",
+            "filename": r.filename,
+            "score": r.score,
+            "rank": position,
+            "relevance": round(-r.rank, 4),  # bm25() is lower-is-better
+            "snippet": str(snippet(document.text, terms)) if document else "",
+        })
+    return results, has_more
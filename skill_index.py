@@ -0,0 +1,120 @@
+"""In-process inverted index from skill to the resumes that have it.
+
+Each skill maps to a sorted uint32 NumPy array of resume ids (4 bytes per
+entry, against roughly 60 for a Python int in a set). It is built from the
+resume_skill table, then kept current by loading only rows with a resume id
+above the highest one already indexed. SQLite hands out ids in commit order
+because it has a single writer, so the delta never misses a new row. Removing
+resumes frees their ids for reuse, so it bumps the 'resumes' generation in
+the database; a refresh that finds it changed rebuilds the index, in every
+process.
+
+Ranking counts required-skill hits per resume with one ``bincount`` over
+the concatenated postings, then picks the top K with ``argpartition``.
+"""
+import threading
+
+import numpy as np
+
+from models import db, User, Resume, ResumeSkill, Skill, current_generation
+
+CANDIDATE_OWNER = 0
+
+
+class SkillIndex:
+    """Readers never take the lock: refresh() builds new arrays and swaps
+    ``(postings, owners, max resume id, generation)`` in as one tuple."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        # postings: skill id -> sorted uint32 resume ids
+        # owners: per resume id, CANDIDATE_OWNER for candidate uploads, else the
+        # HR user id; -1 for ids that are not indexed
+        self._state = ({}, np.full(0, -1, dtype=np.int32), 0, None)
+
+    @property
+    def max_resume_id(self):
+        return self._state[2]
+
+    def refresh(self):
+        """Index resumes added since the last refresh; returns how many."""
+        with self._lock:
+            generation = current_generation('resumes')
+            if generation != self._state[3]:
+                self.clear()
+            postings, owners, max_resume_id, _ = self._state
+            added = (
+                db.session.query(Resume.id, Resume.user_id, User.role)
+                .join(User, User.id == Resume.user_id)
+                .filter(Resume.id > max_resume_id)
+                .order_by(Resume.id)
+                .all()
+            )
+            if not added:
+                self._state = (postings, owners, max_resume_id, generation)
+                return 0
+            new_max = added[-1][0]
+            grown = np.full(new_max + 1, -1, dtype=np.int32)
+            grown[:len(owners)] = owners
+            for resume_id, user_id, role in added:
+                grown[resume_id] = CANDIDATE_OWNER if role == "candidate" else user_id
+
+            # one row per skill instead of one per link: building millions of
+            # result rows costs far more than parsing the joined id lists
+            links = ResumeSkill.__table__.c
+            grouped = db.session.execute(
+                db.select(links.skill_id, db.func.group_concat(links.resume_id))
+                .where(links.resume_id > max_resume_id, links.resume_id <= new_max)
+                .group_by(links.skill_id)
+            ).all()
+            postings = dict(postings)
+            for skill_id, ids in grouped:
+                ids = np.sort(np.array(ids.split(","), dtype=np.uint32))
+                old = postings.get(skill_id)
+                # new ids are all above the old maximum, so appending keeps arrays sorted
+                postings[skill_id] = ids if old is None else np.concatenate((old, ids))
+            self._state = (postings, grown, new_max, generation)
+            return len(added)
+
+    def rebuild(self):
+        """Drop everything and index from scratch (after resumes are deleted or re-scored)."""
+        with self._lock:
+            self.clear()
+        return self.refresh()
+
+    def top_k(self, skill_names, k=20, hr_id=None):
+        """[(resume id, [matched skill names])] best first, newest first on ties.
+
+        With ``hr_id`` only candidate uploads and that HR's own bulk uploads
+        are considered.
+        """
+        postings, owners, _, _ = self._state
+        names = list(dict.fromkeys(skill_names))
+        ids = dict(db.session.query(Skill.name, Skill.id).filter(Skill.name.in_(names)).all())
+        lists = [(name, postings.get(ids.get(name))) for name in names]
+        lists = [(name, ids) for name, ids in lists if ids is not None]
+        if not lists or k <= 0:
+            return []
+
+        size = len(owners)
+        counts = np.bincount(np.concatenate([ids for _, ids in lists]), minlength=size)
+        if hr_id is not None:
+            counts[(owners != CANDIDATE_OWNER) & (owners != hr_id)] = 0
+        hits = np.flatnonzero(counts)
+        if len(hits) == 0:
+            return []
+        # one sort key: more matches first, then higher (newer) id
+        keys = counts[hits].astype(np.int64) * size + hits
+        k = min(k, len(hits))
+        best = hits[np.argpartition(-keys, k - 1)[:k]]
+        best = best[np.argsort(-(counts[best].astype(np.int64) * size + best))]
+
+        results = []
+        for resume_id in best:
+            matched = [name for name, ids in lists
+                       if ids[min(np.searchsorted(ids, resume_id), len(ids) - 1)] == resume_id]
+            results.append((int(resume_id), matched))
+        return results
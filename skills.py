@@ -0,0 +1,186 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from collections import Counter
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skills.json")
+
+# A vocab hit must not sit inside a longer word: "r" should not match "docker",
+# "go" should not match "google".
+_BOUNDARY_BEFORE = r"(?<![a-z0-9])"
+_BOUNDARY_AFTER = r"(?![a-z0-9])"
+
+
+def _trie_pattern(terms):
+    """Build a regex equivalent to ``a|b|...`` but factored on shared prefixes.
+
+    Python's ``re`` tries alternatives one by one, so a flat alternation of a
+    few hundred terms costs a few hundred comparisons at every word start.
+    The trie form only follows branches that match the next character.
+    Optional tails are greedy, so the longest term is tried first.
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node):
+        end = "" in node
+        branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            return "(?:" + body + ")?"
+        return body
+
+    return render(trie)
+
+
+class SkillMatcher:
+    """Finds every vocabulary term in a text in one left-to-right regex pass.
+
+    At each position the regex reports the longest term starting there. Shorter terms that are a
+    word-bounded prefix of that term ("react" in "react native", "ci" in
+    "ci/cd") are added from a table computed once at build time, so nested
+    hits are not lost.
+
+    ``aliases`` maps other spellings to a vocab term ("k8s" -> "kubernetes").
+    They are matched in the same pass and reported under the term they
+    stand for, so a resume gets one skill however it is written.
+    """
+
+    def __init__(self, vocab, aliases=None):
+        terms = []
+        seen = set()
+        for term in vocab:
+            term = term.strip().lower()
+            if term and term not in seen:
+                seen.add(term)
+                terms.append(term)
+        self.terms = tuple(terms)
+
+        self.aliases = {}
+        for alias, term in (aliases or {}).items():
+            alias, term = alias.strip().lower(), term.strip().lower()
+            if term not in seen:
+                raise ValueError(f"alias {alias!r} points to unknown skill {term!r}")
+            if alias in seen:
+                raise ValueError(f"alias {alias!r} is also a skill")
+            self.aliases[alias] = term
+        # every spelling the regex looks for -> the skill it is reported as
+        self._canonical = {term: term for term in self.terms}
+        self._canonical.update(self.aliases)
+        spellings = tuple(self._canonical)
+
+        # The lookahead makes the match zero-width, so the scan visits every
+        # position instead of skipping past the previous hit.
+        self._pattern = re.compile(
+            f"{_BOUNDARY_BEFORE}(?=({_trie_pattern(spellings)}){_BOUNDARY_AFTER})"
+        )
+
+        self._prefixes = {}
+        for spelling in spellings:
+            nested = (
+                self._canonical[other] for other in spellings
+                if other != spelling
+                and spelling.startswith(other)
+                and not spelling[len(other)].isalnum()
+            )
+            self._prefixes[spelling] = tuple(
+                term for term in dict.fromkeys(nested) if term != self._canonical[spelling]
+            )
+
+        digest = hashlib.sha256(json.dumps([self.terms, sorted(self.aliases.items())]).encode())
+        self.version = digest.hexdigest()[:12]
+
+    def spec(self):
+        """(version, terms, aliases): enough to rebuild this matcher in another process."""
+        return self.version, self.terms, self.aliases
+
+    def find(self, text):
+        """Return ``{term: [start positions]}`` for every hit in ``text``."""
+        hits = {}
+        for m in self._pattern.finditer((text or "").lower()):
+            pos = m.start()
+            spelling = m.group(1)
+            hits.setdefault(self._canonical[spelling], []).append(pos)
+            for prefix in self._prefixes[spelling]:
+                hits.setdefault(prefix, []).append(pos)
+        return hits
+
+    def counts(self, text):
+        return Counter({term: len(pos) for term, pos in self.find(text).items()})
+
+
+def load_taxonomy(path=DEFAULT_TAXONOMY_PATH):
+    """SkillMatcher for a taxonomy file.
+
+    The file holds ``{"skills": {category: [skill, ...]}, "aliases":
+    {skill: [other spelling, ...]}}``; categories only group the list.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    vocab = [skill for group in data["skills"].values() for skill in group]
+    aliases = {alias: skill for skill, spellings in data.get("aliases", {}).items() for alias in spellings}
+    return SkillMatcher(vocab, aliases)
+
+
+@lru_cache(maxsize=None)
+def default_matcher():
+    """SkillMatcher over the bundled taxonomy, compiled once per process."""
+    return load_taxonomy(DEFAULT_TAXONOMY_PATH)
+
+
+class SkillTaxonomy:
+    """The matcher for a taxonomy file, rebuilt when the file changes.
+
+    ``matcher()`` checks the file's mtime at most every ``check_interval``
+    seconds. A changed file is compiled aside and swapped in with a single
+    assignment, so callers get either the old matcher or the new one. A file
+    that fails to load is logged and the previous matcher stays in use.
+    """
+
+    def __init__(self, path=DEFAULT_TAXONOMY_PATH, check_interval=5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        self._state = (os.stat(path).st_mtime_ns, load_taxonomy(path))
+
+    def matcher(self):
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval and self._lock.acquire(blocking=False):
+            try:
+                self._checked_at = now
+                self._reload_if_changed()
+            finally:
+                self._lock.release()
+        return self._state[1]
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError as exc:
+            log.error("keeping the current skill taxonomy: %s", exc)
+            return
+        if mtime == self._state[0]:
+            return
+        try:
+            matcher = load_taxonomy(self.path)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as exc:
+            log.error("keeping the current skill taxonomy: cannot load %s: %s", self.path, exc)
+            # remember the mtime so a broken file is reported once, not on every check
+            self._state = (mtime, self._state[1])
+            return
+        log.info("reloaded skill taxonomy %s (version %s)", self.path, matcher.version)
+        self._state = (mtime, matcher)
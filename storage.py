@@ -0,0 +1,89 @@
+import hashlib
+import os
+import tempfile
+import zipfile
+from collections import namedtuple
+
+from werkzeug.utils import secure_filename
+
+CHUNK_SIZE = 64 * 1024
+
+StoredUpload = namedtuple("StoredUpload", "sha256 filename size data")
+
+
+class UploadRejected(ValueError):
+    """The upload is too large or its content does not match its extension."""
+
+
+def sniff_type(head):
+    """'pdf' or 'docx' from the first bytes of a file, or None."""
+    # the PDF header may follow a little junk; readers accept it in the first 1 KB
+    if b"%PDF-" in head[:1024]:
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return "docx"
+    return None
+
+
+def _is_docx(path):
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return "word/document.xml" in archive.namelist()
+    except zipfile.BadZipFile:
+        return False
+
+
+def store_upload(file, folder, max_bytes=None, keep_bytes=0):
+    """Save an uploaded file under the SHA-256 of its content.
+
+    The file is hashed while it is streamed to a temporary file, which is
+    then renamed to ``<sha256>.<ext>``. If that name already exists, the
+    temporary copy is dropped, so identical uploads share one file on disk.
+
+    Raises UploadRejected once more than ``max_bytes`` have been read, or if
+    the content is not the type its extension claims. Files of at most
+    ``keep_bytes`` also come back in ``data`` so they can be parsed without
+    reading them from disk again; larger ones return ``data=None``.
+    """
+    ext = secure_filename(file.filename).rsplit(".", 1)[-1].lower()
+    digest = hashlib.sha256()
+    size = 0
+    kept = []
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = file.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if not size and sniff_type(chunk) != ext:
+                    raise UploadRejected(f"{file.filename} is not a valid {ext.upper()} file")
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise UploadRejected(f"{file.filename} is larger than {max_bytes // (1024 * 1024)} MB")
+                digest.update(chunk)
+                out.write(chunk)
+                if kept is not None:
+                    kept.append(chunk)
+                    if size > keep_bytes:
+                        kept = None
+        if not size:
+            raise UploadRejected(f"{file.filename} is empty")
+        if ext == "docx" and not _is_docx(tmp_path):
+            raise UploadRejected(f"{file.filename} is not a valid DOCX file")
+        sha256 = digest.hexdigest()
+        filename = f"{sha256}.{ext}"
+        path = os.path.join(folder, filename)
+        try:
+            # already stored: keep that copy, its mtime marking it as just used
+            # so the reclaimer leaves it alone (see reclaim.remove_unused_files)
+            os.utime(path)
+        except FileNotFoundError:
+            os.replace(tmp_path, path)
+        else:
+            os.remove(tmp_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return StoredUpload(sha256, filename, size, b"".join(kept) if kept is not None else None)
@@ -0,0 +1,156 @@
+"""Background analysis queue stored in the app database.
+
+Uploads are written as ``AnalysisTask`` rows. Worker threads claim queued
+rows with a single UPDATE, which SQLite serialises, so any number of app
+processes can share one queue without an external broker.
+"""
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+from models import db, AnalysisBatch, AnalysisTask, touch_jobs
+
+log = logging.getLogger(__name__)
+
+_wake = threading.Event()
+_workers = []
+
+
+def wake_workers():
+    """Tell idle workers that new tasks were committed."""
+    _wake.set()
+
+
+def claim_tasks(worker_id, limit):
+    """Atomically mark up to ``limit`` queued tasks as running for this worker.
+
+    Only the rows this call claimed are returned; tasks a failed handler left
+    running are put back by release_tasks, not handed out again.
+    """
+    queued = (
+        db.select(AnalysisTask.id)
+        .where(AnalysisTask.status == 'queued')
+        .order_by(AnalysisTask.id)
+        .limit(limit)
+        .scalar_subquery()
+    )
+    claimed = db.session.execute(
+        db.update(AnalysisTask)
+        .where(AnalysisTask.id.in_(queued), AnalysisTask.status == 'queued')
+        .values(status='running', worker=worker_id, started_at=datetime.utcnow(),
+                attempts=AnalysisTask.attempts + 1)
+        .returning(AnalysisTask.id)
+    ).scalars().all()
+    if not claimed:
+        db.session.commit()
+        return []
+    # their batch pages count running tasks
+    touch_jobs(db.session.scalars(
+        db.select(AnalysisBatch.job_id).distinct()
+        .join(AnalysisTask, AnalysisTask.batch_id == AnalysisBatch.id)
+        .where(AnalysisTask.id.in_(claimed))
+    ))
+    db.session.commit()
+    return AnalysisTask.query.filter(AnalysisTask.id.in_(claimed)).order_by(AnalysisTask.id).all()
+
+
+def release_tasks(worker_id, task_ids, max_attempts, error):
+    """Put back tasks whose handler raised before finishing them.
+
+    The claim already counted the attempt; tasks that used ``max_attempts``
+    are failed with ``error`` instead of being queued again.
+    """
+    unfinished = AnalysisTask.query.filter(
+        AnalysisTask.id.in_(task_ids), AnalysisTask.status == 'running', AnalysisTask.worker == worker_id
+    )
+    touch_jobs(job_id for (job_id,) in unfinished.join(AnalysisBatch, AnalysisBatch.id == AnalysisTask.batch_id)
+               .with_entities(AnalysisBatch.job_id).distinct())
+    failed = unfinished.filter(AnalysisTask.attempts >= max_attempts).update(
+        {'status': 'failed', 'error': error, 'finished_at': datetime.utcnow()},
+        synchronize_session=False,
+    )
+    requeued = unfinished.update({'status': 'queued', 'worker': None}, synchronize_session=False)
+    db.session.commit()
+    return requeued, failed
+
+
+def requeue_stale(max_age_seconds, max_attempts):
+    """Put back tasks left running by a worker that died mid-batch.
+
+    Tasks that already used ``max_attempts`` are failed instead, so one
+    file that kills its worker cannot be retried forever.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age_seconds)
+    stale = AnalysisTask.query.filter(
+        AnalysisTask.status == 'running', AnalysisTask.started_at < cutoff
+    )
+    dead = stale.filter(AnalysisTask.attempts >= max_attempts)
+    # their batch pages show the failures
+    touch_jobs(job_id for (job_id,) in dead.join(AnalysisBatch, AnalysisBatch.id == AnalysisTask.batch_id)
+               .with_entities(AnalysisBatch.job_id).distinct())
+    failed = dead.update(
+        {'status': 'failed', 'error': 'worker stopped while processing',
+         'finished_at': datetime.utcnow()},
+        synchronize_session=False,
+    )
+    requeued = stale.update({'status': 'queued', 'worker': None}, synchronize_session=False)
+    db.session.commit()
+    return requeued, failed
+
+
+class QueueWorker(threading.Thread):
+    def __init__(self, app, handler):
+        super().__init__(daemon=True, name='analysis-queue-worker')
+        self.app = app
+        self.handler = handler
+        self.worker_id = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        self.stopping = threading.Event()
+
+    def run(self):
+        config = self.app.config
+        while not self.stopping.is_set():
+            with self.app.app_context():
+                tasks = []
+                try:
+                    tasks = claim_tasks(self.worker_id, config['ANALYSIS_QUEUE_BATCH'])
+                    if tasks:
+                        task_ids = [task.id for task in tasks]
+                        self.handler(tasks)
+                    else:
+                        requeue_stale(config['ANALYSIS_TASK_STALE_SECONDS'],
+                                      config['ANALYSIS_TASK_MAX_ATTEMPTS'])
+                except Exception as exc:
+                    log.exception('analysis queue worker failed')
+                    db.session.rollback()
+                    if tasks:
+                        self.release(task_ids, exc)
+                    tasks = []
+                finally:
+                    db.session.remove()
+            if not tasks:
+                _wake.wait(config['ANALYSIS_QUEUE_POLL_SECONDS'])
+                _wake.clear()
+
+    def release(self, task_ids, exc):
+        try:
+            release_tasks(self.worker_id, task_ids, self.app.config['ANALYSIS_TASK_MAX_ATTEMPTS'],
+                          f'{type(exc).__name__}: {exc}')
+        except Exception:
+            # requeue_stale picks them up once they are old enough
+            log.exception('could not release analysis tasks')
+            db.session.rollback()
+
+    def stop(self):
+        self.stopping.set()
+        _wake.set()
+
+
+def start_workers(app, handler):
+    """Start ``ANALYSIS_QUEUE_WORKERS`` worker threads for this process."""
+    for _ in range(app.config['ANALYSIS_QUEUE_WORKERS']):
+        worker = QueueWorker(app, handler)
+        worker.start()
+        _workers.append(worker)
+    return list(_workers)
@@ -0,0 +1,74 @@
+import time
+
+import pytest
+from flask import Flask
+
+from models import db, User, JobPost, AnalysisBatch, AnalysisTask
+from tasks import QueueWorker, claim_tasks
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'queue.db'}",
+        ANALYSIS_QUEUE_BATCH=16,
+        ANALYSIS_QUEUE_POLL_SECONDS=0.05,
+        ANALYSIS_TASK_STALE_SECONDS=600,
+        ANALYSIS_TASK_MAX_ATTEMPTS=3,
+    )
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        hr = User(username="hr", email="hr@example.com", password_hash="x", role="hr")
+        db.session.add(hr)
+        db.session.flush()
+        job = JobPost(job_id="JOB-1", title="Engineer", description="python", hr_id=hr.id)
+        db.session.add(job)
+        db.session.flush()
+        batch = AnalysisBatch(batch_id="b1", hr_id=hr.id, job_id=job.id, total=1)
+        db.session.add(batch)
+        db.session.flush()
+        db.session.add(AnalysisTask(batch_id=batch.id, filename="a.pdf", sha256="a" * 64))
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def run_worker(app, handler, seconds):
+    worker = QueueWorker(app, handler)
+    worker.start()
+    time.sleep(seconds)
+    worker.stop()
+    worker.join(5)
+    return worker
+
+
+def test_failing_handler_fails_task_after_max_attempts(app):
+    calls = []
+
+    def handler(tasks):
+        calls.append([task.id for task in tasks])
+        raise RuntimeError("boom")
+
+    run_worker(app, handler, 1)
+
+    with app.app_context():
+        task = AnalysisTask.query.one()
+        assert task.status == "failed"
+        assert task.attempts == 3
+        assert task.error == "RuntimeError: boom"
+        assert task.worker is not None
+        assert JobPost.query.one().revision > 0
+    assert len(calls) == 3
+
+
+def test_claim_returns_only_new_rows(app):
+    with app.app_context():
+        assert [task.filename for task in claim_tasks("w1", 16)] == ["a.pdf"]
+        # the batch page shows it running
+        assert JobPost.query.one().revision == 1
+        # still running for w1, but not claimed again
+        assert claim_tasks("w1", 16) == []